@@ -63,8 +63,11 @@ export function useWebSocket(
 
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        handleEvent({ ...data, id: Date.now().toString() });
+        // The server may coalesce several events into one newline-delimited frame
+        for (const line of event.data.split("\n")) {
+          const data = JSON.parse(line);
+          handleEvent({ ...data, id: Date.now().toString() });
+        }
       } catch (error) {
         console.error("Error parsing WebSocket data:", error);
       }
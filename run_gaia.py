@@ -57,7 +57,7 @@ from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextMa
 from ii_agent.llm.token_counter import TokenCounter
 from ii_agent.utils.constants import DEFAULT_MODEL, TOKEN_BUDGET, UPLOAD_FOLDER_NAME
 from ii_agent.db.manager import Sessions, get_db
-from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.event import EventQueue, RealtimeEvent, EventType
 from ii_agent.tools.youtube_transcript_tool import YoutubeTranscriptTool
 
 # Global lock for thread-safe file appending
@@ -295,7 +295,7 @@ async def answer_single_question(
 
     browser = Browser()
     # Create message queue
-    message_queue = asyncio.Queue()
+    message_queue = EventQueue()
 
     tools = [
         SequentialThinkingTool(),
@@ -355,7 +355,7 @@ Run verification steps if that's needed, you must make sure you find the correct
     start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
         # Add user message to the event queue to save to database
-        await message_queue.put(
+        message_queue.put_nowait(
             RealtimeEvent(
                 type=EventType.USER_MESSAGE, content={"text": augmented_question}
             )
@@ -383,15 +383,9 @@ Run verification steps if that's needed, you must make sure you find the correct
         exception = e
         raised_exception = True
     finally:
-        # Cleanup tasks
-        message_task.cancel()
-        try:
-            # Wait for the task to be cancelled and process remaining messages
-            await message_task
-            # Wait for all messages to be processed
-            await message_queue.join()
-        except asyncio.CancelledError:
-            pass
+        # The processor saves the remaining messages, then exits
+        message_queue.close()
+        await message_task
 
     end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
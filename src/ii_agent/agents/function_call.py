@@ -1,12 +1,14 @@
 import asyncio
 import logging
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from functools import partial
 
+import orjson
+
 from typing import List
 from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
-from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.event import EventQueue, EventType, RealtimeEvent
 from ii_agent.llm.base import (
     LLMClient,
     TextResult,
@@ -59,12 +61,13 @@ try breaking down the task into smaller steps. After call this tool to update or
         tools: List[LLMTool],
         init_history: MessageHistory,
         workspace_manager: WorkspaceManager,
-        message_queue: asyncio.Queue,
+        message_queue: EventQueue,
         logger_for_agent_logs: logging.Logger,
         max_output_tokens_per_turn: int = 8192,
         max_turns: int = 200,
         websocket: Optional[WebSocket] = None,
         interactive_mode: bool = True,
+        event_sink: Optional[Callable[[bytes], Awaitable[None]]] = None,
     ):
         """Initialize the agent.
 
@@ -80,6 +83,8 @@ try breaking down the task into smaller steps. After call this tool to update or
             session_id: UUID of the session this agent belongs to
             interactive_mode: Whether to use interactive mode
             init_history: Optional initial history to use
+            event_sink: Optional coroutine taking a serialized event; when set,
+                events are handed to it instead of written to the websocket
         """
         super().__init__()
         self.workspace_manager = workspace_manager
@@ -90,68 +95,81 @@ try breaking down the task into smaller steps. After call this tool to update or
             logger_for_agent_logs=logger_for_agent_logs,
             interactive_mode=interactive_mode,
         )
+        self._cached_tool_params = None
 
         self.logger_for_agent_logs = logger_for_agent_logs
         self.max_output_tokens = max_output_tokens_per_turn
         self.max_turns = max_turns
 
         self.interrupted = False
+        # Resolved by cancel() to abandon the LLM call or tool run in flight
+        self._interrupt_waiter: Optional[asyncio.Future] = None
         self.history = init_history
         self.session_id = workspace_manager.session_id
 
         # Initialize database manager
         self.message_queue = message_queue
         self.websocket = websocket
+        self.event_sink = event_sink
 
     async def _process_messages(self):
         try:
-            while True:
-                try:
-                    message: RealtimeEvent = await self.message_queue.get()
-
-                    # Save all events to database if we have a session
-                    if self.session_id is not None:
-                        Events.save_event(self.session_id, message)
-                    else:
-                        self.logger_for_agent_logs.info(
-                            f"No session ID, skipping event: {message}"
+            while messages := await self.message_queue.get_batch():
+                self._save_messages(messages)
+                for message in messages:
+                    try:
+                        await self._process_message(message)
+                    except Exception as e:
+                        self.logger_for_agent_logs.error(
+                            f"Error processing WebSocket message: {str(e)}"
                         )
-
-                    # Only send to websocket if this is not an event from the client and websocket exists
-                    if (
-                        message.type != EventType.USER_MESSAGE
-                        and self.websocket is not None
-                    ):
-                        try:
-                            await self.websocket.send_json(message.model_dump())
-                        except Exception as e:
-                            # If websocket send fails, just log it and continue processing
-                            self.logger_for_agent_logs.warning(
-                                f"Failed to send message to websocket: {str(e)}"
-                            )
-                            # Set websocket to None to prevent further attempts
-                            self.websocket = None
-
-                    self.message_queue.task_done()
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    self.logger_for_agent_logs.error(
-                        f"Error processing WebSocket message: {str(e)}"
-                    )
         except asyncio.CancelledError:
             self.logger_for_agent_logs.info("Message processor stopped")
         except Exception as e:
             self.logger_for_agent_logs.error(f"Error in message processor: {str(e)}")
 
+    def _save_messages(self, messages: list[RealtimeEvent]):
+        # Save each drained batch in one transaction rather than one per event
+        if self.session_id is None:
+            self.logger_for_agent_logs.info(
+                f"No session ID, skipping {len(messages)} event(s)"
+            )
+            return
+        try:
+            Events.save_events(self.session_id, messages)
+        except Exception as e:
+            self.logger_for_agent_logs.error(f"Error saving events: {str(e)}")
+
+    async def _process_message(self, message: RealtimeEvent):
+        # Only send to websocket if this is not an event from the client and websocket exists
+        if message.type != EventType.USER_MESSAGE and self.websocket is not None:
+            try:
+                payload = orjson.dumps(message.model_dump())
+                if self.event_sink is not None:
+                    await self.event_sink(payload)
+                else:
+                    await self.websocket.send_text(payload.decode())
+            except Exception as e:
+                # If websocket send fails, just log it and continue processing
+                self.logger_for_agent_logs.warning(
+                    f"Failed to send message to websocket: {str(e)}"
+                )
+                # Set websocket to None to prevent further attempts
+                self.websocket = None
+
     def _validate_tool_parameters(self):
-        """Validate tool parameters and check for duplicates."""
+        """Validate tool parameters and check for duplicates with caching."""
+        if self._cached_tool_params is not None:
+            return self._cached_tool_params
+
         tool_params = [tool.get_tool_param() for tool in self.tool_manager.get_tools()]
         tool_names = [param.name for param in tool_params]
         sorted_names = sorted(tool_names)
         for i in range(len(sorted_names) - 1):
             if sorted_names[i] == sorted_names[i + 1]:
                 raise ValueError(f"Tool {sorted_names[i]} is duplicated")
+
+        self._cached_tool_params = tool_params
         return tool_params
 
     def start_message_processing(self):
@@ -203,6 +221,9 @@ try breaking down the task into smaller steps. After call this tool to update or
 
         remaining_turns = self.max_turns
         while remaining_turns > 0:
+            # Backpressure: if the client or database has fallen far behind on
+            # this agent's events, let it catch up before starting a new turn
+            await self.message_queue.wait_for_room()
             self.history.truncate()
             remaining_turns -= 1
 
@@ -224,16 +245,25 @@ try breaking down the task into smaller steps. After call this tool to update or
                 f"(Current token count: {self.history.count_tokens()})\n"
             )
             loop = asyncio.get_event_loop()
-            model_response, _ = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.generate,
-                    messages=self.history.get_messages_for_llm(),
-                    max_tokens=self.max_output_tokens,
-                    tools=all_tool_params,
-                    system_prompt=self.system_prompt_builder.get_system_prompt(),
-                ),
+            interrupted, generation = await self._await_unless_interrupted(
+                loop.run_in_executor(
+                    None,
+                    partial(
+                        self.client.generate,
+                        messages=self.history.get_messages_for_llm(),
+                        max_tokens=self.max_output_tokens,
+                        tools=all_tool_params,
+                        system_prompt=self.system_prompt_builder.get_system_prompt(),
+                    ),
+                )
             )
+            if interrupted:
+                self.add_fake_assistant_turn(AGENT_INTERRUPT_FAKE_MODEL_RSP)
+                return ToolImplOutput(
+                    tool_output=AGENT_INTERRUPT_MESSAGE,
+                    tool_result_message=AGENT_INTERRUPT_MESSAGE,
+                )
+            model_response, _ = generation
 
             if len(model_response) == 0:
                 model_response = [TextResult(text=COMPLETE_MESSAGE)]
@@ -312,7 +342,16 @@ try breaking down the task into smaller steps. After call this tool to update or
                     tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
                     tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
                 )
-            tool_result = await self.tool_manager.run_tool(tool_call, self.history)
+            interrupted, tool_result = await self._await_unless_interrupted(
+                self.tool_manager.run_tool(tool_call, self.history)
+            )
+            if interrupted:
+                self.add_tool_call_result(tool_call, TOOL_RESULT_INTERRUPT_MESSAGE)
+                self.add_fake_assistant_turn(TOOL_CALL_INTERRUPT_FAKE_MODEL_RSP)
+                return ToolImplOutput(
+                    tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
+                    tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
+                )
 
             self.add_tool_call_result(tool_call, tool_result)
             if self.tool_manager.should_stop():
@@ -396,12 +435,42 @@ try breaking down the task into smaller steps. After call this tool to update or
         """
         self.history.clear()
         self.interrupted = False
+        self._cached_tool_params = None  # Clear cached tool parameters
 
     def cancel(self):
         """Cancel the agent execution."""
         self.interrupted = True
+        if self._interrupt_waiter is not None and not self._interrupt_waiter.done():
+            self._interrupt_waiter.set_result(None)
         self.logger_for_agent_logs.info("Agent cancellation requested")
 
+    async def _await_unless_interrupted(self, awaitable) -> tuple[bool, Any]:
+        """Await an LLM call or tool run, giving up as soon as cancel() is called.
+
+        Returns:
+            A ``(interrupted, result)`` tuple. When interrupted the pending
+            work is cancelled; a blocking call already running in an executor
+            thread finishes in the background and its result is discarded.
+        """
+        work = asyncio.ensure_future(awaitable)
+        waiter = asyncio.get_running_loop().create_future()
+        if self.interrupted:
+            waiter.set_result(None)
+        self._interrupt_waiter = waiter
+        try:
+            await asyncio.wait({work, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        finally:
+            self._interrupt_waiter = None
+            waiter.cancel()
+
+        if work.done():
+            return False, work.result()
+        work.cancel()
+        return True, None
+
     def add_tool_call_result(self, tool_call: ToolCallParameters, tool_result: str):
         """Add a tool call result to the history and send it to the message queue."""
         self.history.add_tool_call_result(tool_call, tool_result)
@@ -5,6 +5,7 @@ from typing import Any, List, Optional, Tuple
 
 from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
+from ii_agent.core.event import EventQueue
 from ii_agent.llm.base import LLMClient, TextResult, ToolCallParameters
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.llm.message_history import MessageHistory
@@ -45,7 +46,7 @@ This agent conducts thorough reviews with emphasis on:
         system_prompt: str,
         client: LLMClient,
         tools: List[LLMTool],
-        message_queue: asyncio.Queue,
+        message_queue: EventQueue,
         logger_for_agent_logs: logging.Logger,
         context_manager: ContextManager,
         max_output_tokens_per_turn: int = 8192,
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
-from typing import Any
+import asyncio
 import enum
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel
 
 
 class EventType(str, enum.Enum):
@@ -27,3 +30,88 @@ class EventType(str, enum.Enum):
 class RealtimeEvent(BaseModel):
     type: EventType
     content: dict[str, Any]
+
+
+class EventQueue:
+    """Single-consumer queue for events emitted by an agent and its tools.
+
+    Producers call ``put_nowait`` exactly as they would on an
+    ``asyncio.Queue``. The consumer awaits ``get_batch`` and receives every
+    pending event at once, so a burst of tool events costs one wakeup
+    instead of one ``Queue.get`` round trip per event.
+
+    With a ``maxsize``, ``put_nowait`` still never blocks or fails, since tools
+    emit events from synchronous code. Producers that can pause instead await
+    ``wait_for_room``, which holds them while ``maxsize`` or more events are
+    queued or still being handled by the consumer.
+    """
+
+    __slots__ = (
+        "_events",
+        "_waiter",
+        "_room_waiter",
+        "_in_flight",
+        "_maxsize",
+        "_closed",
+    )
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._events: deque[RealtimeEvent] = deque()
+        self._waiter: asyncio.Future[None] | None = None
+        self._room_waiter: asyncio.Future[None] | None = None
+        # Size of the batch the consumer is handling; it is done with it when
+        # it asks for the next one
+        self._in_flight = 0
+        self._maxsize = maxsize
+        self._closed = False
+
+    def put_nowait(self, event: RealtimeEvent) -> None:
+        self._events.append(event)
+        self._wake(self._waiter)
+
+    def close(self) -> None:
+        """Let the consumer finish once the events already queued are drained."""
+        self._closed = True
+        self._wake(self._waiter)
+        self._wake(self._room_waiter)
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future[None] | None) -> None:
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def full(self) -> bool:
+        return 0 < self._maxsize <= len(self._events) + self._in_flight
+
+    async def wait_for_room(self) -> None:
+        """Wait until the consumer is less than ``maxsize`` events behind."""
+        while self.full() and not self._closed:
+            self._room_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._room_waiter
+            finally:
+                self._room_waiter = None
+
+    async def get_batch(self) -> list[RealtimeEvent]:
+        """Wait until at least one event is queued, then drain the queue.
+
+        Returns an empty list once the queue is closed and drained.
+        """
+        self._in_flight = 0
+        self._wake(self._room_waiter)
+        while not self._events and not self._closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        events = list(self._events)
+        self._events.clear()
+        self._in_flight = len(events)
+        return events
+
+    def empty(self) -> bool:
+        return not self._events
+
+    def qsize(self) -> int:
+        return len(self._events)
@@ -3,3 +3,11 @@ CONVERSATION_BASE_DIR = "sessions"
 
 def get_conversation_agent_history_filename(sid: str) -> str:
     return f"{CONVERSATION_BASE_DIR}/{sid}/agent_state.pkl"
+
+
+def get_conversation_agent_history_segments_dir(sid: str) -> str:
+    return f"{CONVERSATION_BASE_DIR}/{sid}/agent_state_segments"
+
+
+def get_conversation_agent_history_base_id_filename(sid: str) -> str:
+    return f"{get_conversation_agent_history_segments_dir(sid)}/base_id"
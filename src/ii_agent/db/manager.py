@@ -2,7 +2,8 @@ from contextlib import contextmanager
 from typing import Optional, Generator, List
 import uuid
 from pathlib import Path
-from sqlalchemy import asc, create_engine, text
+from sqlalchemy import and_, asc, create_engine, insert, literal_column, or_, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session as DBSession, sessionmaker
 from ii_agent.core.config.utils import load_ii_agent_config
 from ii_agent.db.models import Session, Event
@@ -89,6 +90,43 @@ class SessionsTable:
 
         return session_uuid, workspace_path
 
+    def get_or_create_session(
+        self,
+        session_uuid: uuid.UUID,
+        workspace_path: Path,
+        device_id: Optional[str] = None,
+        sandbox_id: Optional[str] = None,
+    ) -> tuple[Session, bool]:
+        """Fetch a session, inserting it first if it does not exist yet.
+
+        Uses ``INSERT ... ON CONFLICT DO NOTHING`` so the existence check and the
+        insert happen in one statement and one transaction.
+
+        Args:
+            session_uuid: The UUID for the session
+            workspace_path: The path to the workspace directory
+            device_id: Optional device identifier for the session
+            sandbox_id: Optional sandbox identifier for the session
+
+        Returns:
+            A tuple of (session, created) where created is True if the row was
+            inserted by this call
+        """
+        session_id = str(session_uuid)
+        with get_db() as db:
+            result = db.execute(
+                sqlite_insert(Session)
+                .values(
+                    id=session_id,
+                    workspace_dir=str(workspace_path),
+                    device_id=device_id,
+                    sandbox_id=sandbox_id,
+                )
+                .on_conflict_do_nothing(index_elements=[Session.id])
+            )
+            db_session = db.get(Session, session_id)
+            return db_session, result.rowcount == 1
+
     def get_session_by_workspace(self, workspace_dir: str) -> Optional[Session]:
         """Get a session by its workspace directory.
 
@@ -203,7 +241,7 @@ class SessionsTable:
                 session_data = {
                     "id": row.id,
                     "workspace_dir": row.workspace_dir,
-                    "created_at": row.created_at,
+                    "created_at": str(row.created_at),
                     "device_id": row.device_id,
                     "name": row.name or "",
                     "sandbox_id": row.sandbox_id,
@@ -213,6 +251,10 @@ class SessionsTable:
             return sessions
 
 
+# Events saved in one batch can share a timestamp; insertion order breaks ties
+_EVENT_ROWID = literal_column("event.rowid")
+
+
 class EventsTable:
     """Table class for event operations following Open WebUI pattern."""
 
@@ -236,6 +278,28 @@ class EventsTable:
             db.flush()  # This will populate the id field
             return uuid.UUID(db_event.id)
 
+    def save_events(self, session_id: uuid.UUID, events: list[RealtimeEvent]) -> None:
+        """Save a batch of events to the database in one transaction.
+
+        Args:
+            session_id: The UUID of the session the events belong to
+            events: The events to save, in order
+        """
+        if not events:
+            return
+        with get_db() as db:
+            db.execute(
+                insert(Event),
+                [
+                    {
+                        "session_id": str(session_id),
+                        "event_type": event.type.value,
+                        "event_payload": event.model_dump(),
+                    }
+                    for event in events
+                ],
+            )
+
     def get_session_events(self, session_id: uuid.UUID) -> list[Event]:
         """Get all events for a session.
 
@@ -246,7 +310,12 @@ class EventsTable:
             A list of events for the session
         """
         with get_db() as db:
-            return db.query(Event).filter(Event.session_id == str(session_id)).all()
+            return (
+                db.query(Event)
+                .filter(Event.session_id == str(session_id))
+                .order_by(asc(Event.timestamp), asc(_EVENT_ROWID))
+                .all()
+            )
 
     def delete_session_events(self, session_id: uuid.UUID) -> None:
         """Delete all events for a session.
@@ -267,56 +336,65 @@ class EventsTable:
         with get_db() as db:
             # Find the last user message event
             last_user_event = (
-                db.query(Event)
+                db.query(Event.timestamp, _EVENT_ROWID)
                 .filter(
                     Event.session_id == str(session_id),
                     Event.event_type == EventType.USER_MESSAGE.value,
                 )
-                .order_by(Event.timestamp.desc())
+                .order_by(Event.timestamp.desc(), _EVENT_ROWID.desc())
                 .first()
             )
 
             if last_user_event:
+                timestamp, rowid = last_user_event
                 # Delete all events after the last user message (inclusive)
                 db.query(Event).filter(
                     Event.session_id == str(session_id),
-                    Event.timestamp >= last_user_event.timestamp,
-                ).delete()
+                    or_(
+                        Event.timestamp > timestamp,
+                        and_(Event.timestamp == timestamp, _EVENT_ROWID >= rowid),
+                    ),
+                ).delete(synchronize_session=False)
             else:
                 # If no user message found, delete all events
                 db.query(Event).filter(Event.session_id == str(session_id)).delete()
 
-    def get_session_events_with_details(self, session_id: str) -> List[dict]:
+    def get_session_events_with_details(
+        self, session_id: str, offset: int = 0, limit: Optional[int] = None
+    ) -> List[dict]:
         """Get all events for a specific session ID with session details, sorted by timestamp ascending.
 
         Args:
             session_id: The session identifier to look up events for
+            offset: Number of events to skip from the start
+            limit: Optional maximum number of events to return
 
         Returns:
             A list of event dictionaries with their details, sorted by timestamp ascending
         """
         with get_db() as db:
-            events = (
-                db.query(Event)
+            # Join the session in the same query instead of lazy-loading it per event
+            query = (
+                db.query(Event, Session.workspace_dir)
+                .join(Session, Event.session_id == Session.id)
                 .filter(Event.session_id == session_id)
-                .order_by(asc(Event.timestamp))
-                .all()
+                .order_by(asc(Event.timestamp), asc(_EVENT_ROWID))
+                .offset(offset)
             )
+            if limit is not None:
+                query = query.limit(limit)
 
-            # Convert events to a list of dictionaries
-            event_list = []
-            for e in events:
-                event_data = {
+            return [
+                {
                     "id": e.id,
                     "session_id": e.session_id,
                     "timestamp": e.timestamp.isoformat(),
                     "event_type": e.event_type,
                     "event_payload": e.event_payload,
-                    "workspace_dir": e.session.workspace_dir,
+                    "workspace_dir": workspace_dir,
                 }
-                event_list.append(event_data)
-
-            return event_list
+                for e, workspace_dir in query
+            ]
 
 
 # Create singleton instances following Open WebUI pattern
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 from typing import Optional
@@ -54,6 +54,9 @@ class Event(Base):
     """Database model for agent events."""
 
     __tablename__ = "event"
+    __table_args__ = (
+        Index("ix_event_session_id_timestamp", "session_id", "timestamp"),
+    )
 
     # Store UUID as string in SQLite
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
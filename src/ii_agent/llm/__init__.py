@@ -1,19 +1,50 @@
+import hashlib
+from collections import OrderedDict
+
 from ii_agent.core.config.llm_config import APITypes, LLMConfig
 from ii_agent.llm.base import LLMClient
 from ii_agent.llm.openai import OpenAIDirectClient
 from ii_agent.llm.anthropic import AnthropicDirectClient
 from ii_agent.llm.gemini import GeminiDirectClient
 
+# Clients wrap SDK objects that own HTTP connection pools; reuse them across
+# sessions that share the same configuration instead of re-handshaking. The
+# clients only set attributes in __init__ and the underlying SDK clients are
+# thread-safe, so one instance may serve concurrent executor threads. Bounded
+# so rotated keys and one-off settings do not pile up for the process lifetime.
+_CLIENT_CACHE: "OrderedDict[tuple[str, str], LLMClient]" = OrderedDict()
+CLIENT_CACHE_SIZE = 32
+
+
+_CLIENT_CLASSES: dict[APITypes, type[LLMClient]] = {
+    APITypes.ANTHROPIC: AnthropicDirectClient,
+    APITypes.OPENAI: OpenAIDirectClient,
+    APITypes.GEMINI: GeminiDirectClient,
+}
+
+
+def _build_client(config: LLMConfig) -> LLMClient:
+    return _CLIENT_CLASSES[config.api_type](llm_config=config)
+
+
+def _client_cache_key(config: LLMConfig) -> tuple[str, str]:
+    # The default dump masks the API key, so only a digest of it is kept
+    api_key = config.api_key.get_secret_value() if config.api_key else ""
+    return config.model_dump_json(), hashlib.sha256(api_key.encode()).hexdigest()
+
+
 def get_client(config: LLMConfig) -> LLMClient:
     """Get a client for a given client name."""
-    if config.api_type == APITypes.ANTHROPIC:
-        return AnthropicDirectClient(
-            llm_config=config,
-        )
-    elif config.api_type == APITypes.OPENAI:
-        return OpenAIDirectClient(llm_config=config)
-    elif config.api_type == APITypes.GEMINI:
-        return GeminiDirectClient(llm_config=config)
+    key = _client_cache_key(config)
+    client = _CLIENT_CACHE.get(key)
+    if client is not None:
+        _CLIENT_CACHE.move_to_end(key)
+        return client
+    client = _build_client(config)
+    _CLIENT_CACHE[key] = client
+    if len(_CLIENT_CACHE) > CLIENT_CACHE_SIZE:
+        _CLIENT_CACHE.popitem(last=False)
+    return client
 
 
 __all__ = [
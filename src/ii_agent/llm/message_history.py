@@ -1,11 +1,17 @@
 import pickle
 import base64
 import json
+import threading
+import uuid
 
 from typing import Optional, cast, Any
 
 from ii_agent.core.storage.files import FileStore
-from ii_agent.core.storage.locations import get_conversation_agent_history_filename
+from ii_agent.core.storage.locations import (
+    get_conversation_agent_history_base_id_filename,
+    get_conversation_agent_history_filename,
+    get_conversation_agent_history_segments_dir,
+)
 from ii_agent.llm.base import (
     AssistantContentBlock,
     GeneralContentBlock,
@@ -19,6 +25,31 @@ from ii_agent.llm.base import (
 )
 from ii_agent.llm.context_manager.base import ContextManager
 
+# Appended turns are saved as small delta segments next to the base snapshot;
+# once this many have accumulated the next save rewrites the snapshot instead
+MAX_HISTORY_SEGMENTS = 16
+
+# Saves and restores of one session id are serialized, since a reconnect can
+# load and save a second history while the old one is still shutting down
+_SESSION_LOCKS: dict[str, threading.Lock] = {}
+_SESSION_LOCKS_GUARD = threading.Lock()
+
+
+def _session_lock(session_id: str) -> threading.Lock:
+    with _SESSION_LOCKS_GUARD:
+        lock = _SESSION_LOCKS.get(session_id)
+        if lock is None:
+            lock = _SESSION_LOCKS[session_id] = threading.Lock()
+        return lock
+
+
+def _encode_turns(turns: list[list[GeneralContentBlock]]) -> str:
+    return base64.b64encode(pickle.dumps(turns)).decode("utf-8")
+
+
+def _decode_turns(encoded: str) -> list[list[GeneralContentBlock]]:
+    return pickle.loads(base64.b64decode(encoded))
+
 
 class MessageHistory:
     """Stores the sequence of messages in a dialog."""
@@ -26,9 +57,17 @@ class MessageHistory:
     def __init__(self, context_manager: ContextManager):
         self._context_manager = context_manager
         self._message_lists: list[list[GeneralContentBlock]] = []
+        # Most recent ToolCall per tool name, kept in sync with _message_lists
+        self._last_tool_calls: dict[str, ToolCall] = {}
         self._last_user_prompt_index: int | None = (
             None  # Track the last user prompt index
         )
+        # Blocks of every turn already in the file store (None until the
+        # history has been saved or restored), the id of the base snapshot they
+        # extend and the number of delta segments written after it
+        self._persisted_turns: list[tuple[GeneralContentBlock, ...]] | None = None
+        self._persisted_base_id: str | None = None
+        self._persisted_segments = 0
 
     @classmethod
     def _ensure_tool_call_integrity(
@@ -109,27 +148,102 @@ class MessageHistory:
     def restore_from_session(self, session_id: str, file_store: FileStore):
         """Restores the message history from the file store."""
         try:
-            encoded = file_store.read(
-                get_conversation_agent_history_filename(session_id)
-            )
-            pickled = base64.b64decode(encoded)
-            self._message_lists = pickle.loads(pickled)
+            with _session_lock(session_id):
+                encoded = file_store.read(
+                    get_conversation_agent_history_filename(session_id)
+                )
+                message_lists = _decode_turns(encoded)
+                base_id = self._read_base_id(session_id, file_store)
+                segment_paths = self._list_segments(session_id, file_store)
+                for path in segment_paths:
+                    message_lists.extend(_decode_turns(file_store.read(path)))
+            self._message_lists = message_lists
+            self._reindex_tool_calls()
+            self._persisted_turns = [tuple(turn) for turn in message_lists]
+            self._persisted_base_id = base_id
+            self._persisted_segments = len(segment_paths)
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"Could not restore history from file for session id: {session_id}"
             )
 
     def save_to_session(self, session_id: str, file_store: FileStore):
-        pickled = pickle.dumps(self._message_lists)
-        encoded = base64.b64encode(pickled).decode("utf-8")
+        """Saves the message history to the file store.
 
+        When the history has only grown since the last save or restore, and
+        no other history has saved this session since, just the new turns are
+        written as a delta segment. Any other change, or too many segments,
+        rewrites the full snapshot, so the last writer wins as a whole.
+        """
+        segments_dir = get_conversation_agent_history_segments_dir(session_id)
         try:
-            file_store.write(
-                get_conversation_agent_history_filename(session_id), encoded
-            )
+            with _session_lock(session_id):
+                new_turns = self._unpersisted_turns()
+                if new_turns is not None and (
+                    self._persisted_segments >= MAX_HISTORY_SEGMENTS
+                    or self._read_base_id(session_id, file_store)
+                    != self._persisted_base_id
+                    or len(self._list_segments(session_id, file_store))
+                    != self._persisted_segments
+                ):
+                    new_turns = None
+                if new_turns is None:
+                    # Drop the old segments first so a failed write can only
+                    # lose the latest turns, never replay stale ones on restore
+                    file_store.delete(segments_dir)
+                    self._persisted_base_id = None
+                    self._persisted_segments = 0
+                    file_store.write(
+                        get_conversation_agent_history_filename(session_id),
+                        _encode_turns(self._message_lists),
+                    )
+                    base_id = uuid.uuid4().hex
+                    file_store.write(
+                        get_conversation_agent_history_base_id_filename(session_id),
+                        base_id,
+                    )
+                    self._persisted_base_id = base_id
+                elif new_turns:
+                    file_store.write(
+                        f"{segments_dir}/{self._persisted_segments + 1:06d}.pkl",
+                        _encode_turns(new_turns),
+                    )
+                    self._persisted_segments += 1
+            self._persisted_turns = [tuple(turn) for turn in self._message_lists]
         except Exception as e:
+            self._persisted_turns = None
             raise Exception(f"Error saving message history to session: {e}")
 
+    def _unpersisted_turns(self) -> Optional[list[list[GeneralContentBlock]]]:
+        """Returns the turns added since the last save, or None if any saved
+        turn was removed or rewritten."""
+        persisted = self._persisted_turns
+        if persisted is None or len(persisted) > len(self._message_lists):
+            return None
+        for saved, turn in zip(persisted, self._message_lists):
+            if len(saved) != len(turn) or any(a is not b for a, b in zip(saved, turn)):
+                return None
+        return self._message_lists[len(persisted) :]
+
+    @staticmethod
+    def _read_base_id(session_id: str, file_store: FileStore) -> Optional[str]:
+        try:
+            return file_store.read(
+                get_conversation_agent_history_base_id_filename(session_id)
+            )
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _list_segments(session_id: str, file_store: FileStore) -> list[str]:
+        try:
+            paths = file_store.list(
+                get_conversation_agent_history_segments_dir(session_id)
+            )
+        except FileNotFoundError:
+            return []
+        return sorted(path for path in paths if path.endswith(".pkl"))
+
     def add_user_prompt(
         self, prompt: str, image_blocks: list[dict[str, Any]] | None = None
     ):
@@ -169,6 +283,22 @@ class MessageHistory:
         self._message_lists.append(
             cast(list[GeneralContentBlock], messages_with_one_tool_call)
         )
+        for message in messages_with_one_tool_call:
+            if isinstance(message, ToolCall):
+                self._last_tool_calls[message.tool_name] = message
+
+    def get_last_tool_call(self, tool_name: str) -> Optional[ToolCall]:
+        """Returns the most recent call to the given tool, if any."""
+        return self._last_tool_calls.get(tool_name)
+
+    def _reindex_tool_calls(self):
+        """Rebuilds the last-call index after the message list is replaced."""
+        self._last_tool_calls = {
+            message.tool_name: message
+            for turn in self._message_lists
+            for message in turn
+            if isinstance(message, ToolCall)
+        }
 
     def get_messages_for_llm(self) -> LLMMessages:  # TODO: change name to get_messages
         """Returns messages formatted for the LLM client."""
@@ -224,6 +354,7 @@ class MessageHistory:
         """Removes all messages."""
         self._message_lists = []
         self._last_user_prompt_index = None
+        self._last_tool_calls = {}
 
     def clear_from_last_to_user_message(self):
         """Clears messages from the last turn backwards to the last user prompt (inclusive).
@@ -234,6 +365,7 @@ class MessageHistory:
 
         # Keep messages up to and excluding the last user prompt
         self._message_lists = self._message_lists[: self._last_user_prompt_index]
+        self._reindex_tool_calls()
         # Reset the last user prompt index since we've cleared after it
         self._last_user_prompt_index = None
 
@@ -278,6 +410,7 @@ class MessageHistory:
     def set_message_list(self, message_list: list[list[GeneralContentBlock]]):
         """Sets the message list and ensures tool call integrity."""
         self._message_lists = MessageHistory._ensure_tool_call_integrity(message_list)
+        self._reindex_tool_calls()
 
     def count_tokens(self):
         """Counts the tokens in the message list."""
@@ -0,0 +1,30 @@
+"""Add event session/timestamp index
+
+Revision ID: 3f1c9b7e2a41
+Revises: d6e272e1eb0d
+Create Date: 2025-07-15 10:12:08.413527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9b7e2a41"
+down_revision: Union[str, None] = "d6e272e1eb0d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_event_session_id_timestamp", "event", ["session_id", "timestamp"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_event_session_id_timestamp", table_name="event")
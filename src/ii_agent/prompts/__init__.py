@@ -3,11 +3,15 @@ from ii_agent.prompts.system_prompt import (
     get_system_prompt_with_seq_thinking,
     SystemPromptBuilder,
 )
-from ii_agent.prompts.reviewer_system_prompt import REVIEWER_SYSTEM_PROMPT
+from ii_agent.prompts.reviewer_system_prompt import (
+    REVIEWER_SYSTEM_PROMPT,
+    build_reviewer_prompt,
+)
 
 __all__ = [
     "get_system_prompt",
     "get_system_prompt_with_seq_thinking",
     "REVIEWER_SYSTEM_PROMPT",
+    "build_reviewer_prompt",
     "SystemPromptBuilder",
 ]
@@ -1,8 +1,10 @@
 from datetime import datetime
-import platform
+from functools import lru_cache
+from string import Template
+import sys
 
 
-REVIEWER_SYSTEM_PROMPT = f"""\
+_REVIEWER_SYSTEM_PROMPT_TEMPLATE = Template("""\
 You are Reviewer Agent, a ruthless failure detection specialist whose job is to hunt down and expose every broken, incomplete, or dysfunctional aspect of AI agent outputs.
 
 <role>
@@ -217,5 +219,20 @@ Focus on High Impact + Easy/Moderate Implementation + Critical/Important User Va
 - Test the website like you're trying to prove it doesn't work
 </tool_usage>
 
-Today is {datetime.now().strftime("%Y-%m-%d")}. Your task is to provide a comprehensive, actionable review that will help improve the agent's capabilities and deliver better outcomes for users.
-"""
\ No newline at end of file
+Today is $today. Your task is to provide a comprehensive, actionable review that will help improve the agent's capabilities and deliver better outcomes for users.
+""")
+
+
+@lru_cache(maxsize=4)
+def _render_reviewer_prompt(today: str) -> str:
+    # Interned so every caller shares one canonical object per day, which keeps
+    # prompt caches keyed on the string (or its id) hitting across sessions.
+    return sys.intern(_REVIEWER_SYSTEM_PROMPT_TEMPLATE.substitute(today=today))
+
+
+def build_reviewer_prompt() -> str:
+    """Return the reviewer system prompt rendered for the current date."""
+    return _render_reviewer_prompt(datetime.now().strftime("%Y-%m-%d"))
+
+
+REVIEWER_SYSTEM_PROMPT = build_reviewer_prompt()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 import platform
 from ii_agent.sandbox.config import SandboxSettings
 
@@ -9,10 +10,8 @@ from ii_agent.utils.constants import WorkSpaceMode
 class SystemPromptBuilder:
     def __init__(self, workspace_mode: WorkSpaceMode, sequential_thinking: bool):
         self.workspace_mode = workspace_mode
-        self.default_system_prompt = (
-            get_system_prompt(workspace_mode)
-            if not sequential_thinking
-            else get_system_prompt_with_seq_thinking(workspace_mode)
+        self.default_system_prompt = _render_default_system_prompt(
+            workspace_mode, sequential_thinking, datetime.now().strftime("%Y-%m-%d")
         )
         self.system_prompt = self.default_system_prompt
 
@@ -30,6 +29,18 @@ class SystemPromptBuilder:
 """
 
 
+@lru_cache(maxsize=16)
+def _render_default_system_prompt(
+    workspace_mode: WorkSpaceMode, sequential_thinking: bool, today: str
+) -> str:
+    # The rendered prompt only varies with these inputs and the date, so every
+    # session sharing them reuses one string. Builders are still per session
+    # because update_web_dev_rules mutates them.
+    if sequential_thinking:
+        return get_system_prompt_with_seq_thinking(workspace_mode)
+    return get_system_prompt(workspace_mode)
+
+
 def get_home_directory(workspace_mode: WorkSpaceMode) -> str:
     if workspace_mode != WorkSpaceMode.LOCAL:
         return SandboxSettings().work_dir
@@ -1,10 +1,12 @@
 import os
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SandboxSettings(BaseModel):
     """Configuration for the execution sandbox"""
 
+    model_config = ConfigDict(frozen=True)
+
     image: str = Field(
         f"{os.getenv('COMPOSE_PROJECT_NAME')}-sandbox", description="Base image"
     )  # Quick fix for now, should be refactored
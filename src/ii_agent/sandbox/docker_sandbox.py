@@ -11,6 +11,9 @@ from ii_agent.sandbox.config import SandboxSettings
 from ii_agent.sandbox.sandbox_registry import SandboxRegistry
 from ii_agent.utils.constants import WorkSpaceMode
 
+# Environment-derived and read-only, so one instance serves every sandbox.
+_SANDBOX_SETTINGS = SandboxSettings()
+
 
 @SandboxRegistry.register(WorkSpaceMode.DOCKER)
 class DockerSandbox(BaseSandbox):
@@ -40,7 +43,7 @@ class DockerSandbox(BaseSandbox):
             volume_bindings: Volume mappings in {host_path: container_path} format.
         """
         super().__init__(session_id=container_name, settings=settings)
-        self.config = SandboxSettings()
+        self.config = _SANDBOX_SETTINGS
         self.volume_bindings = {
             load_ii_agent_config().host_workspace
             + "/"
@@ -73,37 +76,9 @@ class DockerSandbox(BaseSandbox):
             docker.errors.APIError: If Docker API call fails.
             RuntimeError: If container creation or startup fails.
         """
-        os.makedirs(self.config.work_dir, exist_ok=True)
         try:
-            # Prepare container config
-            host_config = self.client.api.create_host_config(
-                mem_limit=self.config.memory_limit,
-                cpu_period=100000,
-                cpu_quota=int(100000 * self.config.cpu_limit),
-                network_mode=None
-                if not self.config.network_enabled
-                else self.config.network_name,
-                binds=self._prepare_volume_bindings(),
-            )
-
-            # Create container
-            container = await asyncio.to_thread(
-                self.client.api.create_container,
-                image=self.config.image,
-                hostname="sandbox",
-                host_config=host_config,
-                name=self.session_id,
-                labels={
-                    "com.docker.compose.project": os.getenv("COMPOSE_PROJECT_NAME")
-                },
-                tty=True,
-                detach=True,
-                stdin_open=True,  # Enable interactive mode
-            )
-
-            self.container = self.client.containers.get(container["Id"])
-            self.container_id = container["Id"]
-            self.container.start()
+            # All blocking filesystem and Docker calls happen in a single thread hop
+            self.container_id = await asyncio.to_thread(self._create_sync)
 
             self.host_url = (
                 f"http://{self.session_id}:{self.settings.sandbox_config.service_port}"
@@ -114,6 +89,41 @@ class DockerSandbox(BaseSandbox):
             await self.cleanup()  # Ensure resources are cleaned up
             raise RuntimeError(f"Failed to create sandbox: {e}") from e
 
+    def _create_sync(self) -> str:
+        """Creates and starts the container, blocking the calling thread.
+
+        Returns:
+            ID of the started container.
+        """
+        os.makedirs(self.config.work_dir, exist_ok=True)
+
+        # Prepare container config
+        host_config = self.client.api.create_host_config(
+            mem_limit=self.config.memory_limit,
+            cpu_period=100000,
+            cpu_quota=int(100000 * self.config.cpu_limit),
+            network_mode=None
+            if not self.config.network_enabled
+            else self.config.network_name,
+            binds=self._prepare_volume_bindings(),
+        )
+
+        # Create container
+        container = self.client.api.create_container(
+            image=self.config.image,
+            hostname="sandbox",
+            host_config=host_config,
+            name=self.session_id,
+            labels={"com.docker.compose.project": os.getenv("COMPOSE_PROJECT_NAME")},
+            tty=True,
+            detach=True,
+            stdin_open=True,  # Enable interactive mode
+        )
+
+        self.container = self.client.containers.get(container["Id"])
+        self.container.start()
+        return container["Id"]
+
     def _prepare_volume_bindings(self) -> Dict[str, Dict[str, str]]:
         """Prepares volume binding configuration.
 
@@ -127,29 +137,6 @@ class DockerSandbox(BaseSandbox):
 
         return bindings
 
-    def _safe_resolve_path(self, path: str) -> str:
-        """Safely resolves container path, preventing path traversal.
-
-        Args:
-            path: Original path.
-
-        Returns:
-            Resolved absolute path.
-
-        Raises:
-            ValueError: If path contains potentially unsafe patterns.
-        """
-        # Check for path traversal attempts
-        if ".." in path.split("/"):
-            raise ValueError("Path contains potentially unsafe patterns")
-
-        resolved = (
-            os.path.join(self.config.work_dir, path)
-            if not os.path.isabs(path)
-            else path
-        )
-        return resolved
-
     async def cleanup(self) -> None:
         """Cleans up sandbox resources."""
         errors = []
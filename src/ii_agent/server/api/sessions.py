@@ -3,7 +3,9 @@ Session management API endpoints.
 """
 
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 
 from ii_agent.db.manager import Events, Sessions
 from ..models.messages import SessionResponse, EventResponse, SessionInfo, EventInfo
@@ -12,6 +14,8 @@ logger = logging.getLogger(__name__)
 
 sessions_router = APIRouter(prefix="/api", tags=["sessions"])
 
+MAX_EVENTS_PAGE_SIZE = 500
+
 
 @sessions_router.get("/sessions/{device_id}", response_model=SessionResponse)
 def get_sessions_by_device_id(device_id: str):
@@ -25,8 +29,10 @@ def get_sessions_by_device_id(device_id: str):
     """
     try:
         sessions_raw = Sessions.get_sessions_by_device_id(device_id)
-        sessions = [SessionInfo(**session) for session in sessions_raw]
-        return SessionResponse(sessions=sessions)
+        # Rows come straight from the DB layer in SessionInfo's shape, so skip
+        # re-validating every field on the way out.
+        sessions = [SessionInfo.model_construct(**session) for session in sessions_raw]
+        return SessionResponse.model_construct(sessions=sessions)
 
     except Exception as e:
         logger.error(f"Error retrieving sessions: {str(e)}")
@@ -36,20 +42,27 @@ def get_sessions_by_device_id(device_id: str):
 
 
 @sessions_router.get("/sessions/{session_id}/events", response_model=EventResponse)
-def get_session_events(session_id: str):
+def get_session_events(
+    session_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENTS_PAGE_SIZE),
+):
     """Get all events for a specific session ID, sorted by timestamp ascending.
 
     Args:
         session_id: The session identifier to look up events for
+        offset: Number of events to skip, for paging through long sessions
+        limit: Optional page size, capped at MAX_EVENTS_PAGE_SIZE
 
     Returns:
         A list of events with their details, sorted by timestamp ascending
     """
     try:
-        events_raw = Events.get_session_events_with_details(session_id)
-        events = [EventInfo(**event) for event in events_raw]
-        return EventResponse(events=events)
-        
+        events_raw = Events.get_session_events_with_details(
+            session_id, offset=offset, limit=limit
+        )
+        events = [EventInfo.model_construct(**event) for event in events_raw]
+        return EventResponse.model_construct(events=events)
 
     except Exception as e:
         logger.error(f"Error retrieving events: {str(e)}")
@@ -1,19 +1,57 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import ORJSONResponse
 
 from ii_agent.core.storage.models.settings import Settings
 from ii_agent.core.storage.settings.settings_store import SettingsStore
 from ii_agent.server.models.messages import GETSettingsModel
-from ii_agent.server.settings import get_settings, get_settings_store
-
-
-settings_router = APIRouter(prefix="/api", tags=["settings"])
+from ii_agent.server.settings import (
+    cache_settings_payload,
+    get_cached_settings_payload,
+    get_settings_store,
+    invalidate_settings_cache,
+    settings_generation,
+)
+
+
+settings_router = APIRouter(
+    prefix="/api", tags=["settings"], default_response_class=ORJSONResponse
+)
+
+# (config section, field) pairs that must never be sent back to the client
+_API_KEY_FIELDS = (
+    ("audio_config", "openai_api_key"),
+    ("search_config", "firecrawl_api_key"),
+    ("search_config", "serpapi_api_key"),
+    ("search_config", "tavily_api_key"),
+    ("search_config", "jina_api_key"),
+    ("media_config", "google_ai_studio_api_key"),
+    ("sandbox_config", "sandbox_api_key"),
+    ("sandbox_config", "template_id"),
+    ("third_party_integration_config", "vercel_api_key"),
+    ("third_party_integration_config", "openai_api_key"),
+    ("third_party_integration_config", "neon_db_api_key"),
+)
+
+# The same table grouped by section as ready-made {field: None} patches, so each
+# section is scrubbed with a single dict.update
+_API_KEY_SCRUB_PATCHES: dict[str, dict[str, None]] = {}
+for _section_name, _field_name in _API_KEY_FIELDS:
+    _API_KEY_SCRUB_PATCHES.setdefault(_section_name, {})[_field_name] = None
 
 
 @settings_router.get("/settings", response_model=GETSettingsModel)
-async def load_settings(settings: Settings = Depends(get_settings)):
+async def load_settings(settings_store: SettingsStore = Depends(get_settings_store)):
+    # Read the generation before loading, so a concurrent store can only make
+    # this payload miss the cache, never be cached under the newer generation
+    generation = settings_generation()
+    cached_payload = get_cached_settings_payload(generation)
+    if cached_payload is not None:
+        return Response(content=cached_payload, media_type="application/json")
+
+    settings = await settings_store.load()
     if not settings:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"error": "Settings not found"},
         )
@@ -32,42 +70,29 @@ async def load_settings(settings: Settings = Depends(get_settings)):
         and settings.search_config.api_key is not None
     )
 
-    settings_with_api_keys = GETSettingsModel(
-        llm_api_key_set=llm_api_key_set,
-        search_api_key_set=search_api_key_set,
-        **settings.model_dump(exclude={"secrets_store"}),
-    )
+    # Patch the dumped dict rather than re-validating it into a GETSettingsModel
+    settings_dict = settings.model_dump(mode="json", exclude={"secrets_store"})
+    settings_dict["llm_api_key_set"] = llm_api_key_set
+    settings_dict["search_api_key_set"] = search_api_key_set
 
     # Set API keys to None
-    for model_name in settings_with_api_keys.llm_configs.keys():
-        settings_with_api_keys.llm_configs[model_name].api_key = None
-    if settings_with_api_keys.audio_config:
-        settings_with_api_keys.audio_config.openai_api_key = None
-    if settings_with_api_keys.search_config:
-        settings_with_api_keys.search_config.firecrawl_api_key = None
-        settings_with_api_keys.search_config.serpapi_api_key = None
-        settings_with_api_keys.search_config.tavily_api_key = None
-        settings_with_api_keys.search_config.jina_api_key = None
-    if settings_with_api_keys.media_config:
-        settings_with_api_keys.media_config.google_ai_studio_api_key = None
-    if settings_with_api_keys.sandbox_config:
-        settings_with_api_keys.sandbox_config.sandbox_api_key = None
-        settings_with_api_keys.sandbox_config.template_id = None
-    if settings_with_api_keys.third_party_integration_config:
-        settings_with_api_keys.third_party_integration_config.vercel_api_key = None
-        settings_with_api_keys.third_party_integration_config.openai_api_key = None
-        settings_with_api_keys.third_party_integration_config.neon_db_api_key = None
-
-    return settings_with_api_keys
-
-
-async def store_llm_settings(
-    settings: Settings, settings_store: SettingsStore
-) -> Settings:
-    existing_settings = await settings_store.load()
-    if existing_settings:
-        settings.update(existing_settings)
-
+    for llm_config in settings_dict["llm_configs"].values():
+        llm_config["api_key"] = None
+    for section_name, patch in _API_KEY_SCRUB_PATCHES.items():
+        section = settings_dict[section_name]
+        if section:
+            section.update(patch)
+
+    # Serialize directly so FastAPI skips jsonable_encoder and response_model
+    # validation; response_model is kept for the OpenAPI schema only.
+    payload = orjson.dumps(settings_dict)
+    cache_settings_payload(generation, payload)
+    return Response(content=payload, media_type="application/json")
+
+
+def store_llm_settings(settings: Settings, existing_settings: Settings) -> Settings:
+    """Fill secrets missing from ``settings`` with the already stored ones."""
+    settings.update(existing_settings)
     return settings
 
 
@@ -79,15 +104,16 @@ async def store_settings(
         existing_settings = await settings_store.load()
         if existing_settings:
             # Keep existing LLM settings if not provided
-            settings = await store_llm_settings(settings, settings_store)
+            settings = store_llm_settings(settings, existing_settings)
 
         await settings_store.store(settings)
+        invalidate_settings_cache()
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={"message": "Settings stored"}, status_code=status.HTTP_200_OK
         )
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             content={"message": f"Error storing settings: {e}"},
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
@@ -1,14 +1,98 @@
+import asyncio
 import base64
 import logging
+import re
 from pathlib import Path
+from typing import IO
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from ii_agent.utils.constants import UPLOAD_FOLDER_NAME
 
 logger = logging.getLogger(__name__)
 
-upload_router = APIRouter(prefix="/api", tags=["upload"])
+upload_router = APIRouter(
+    prefix="/api", tags=["upload"], default_response_class=ORJSONResponse
+)
+
+# Encoded characters decoded per write
+_BASE64_CHUNK_SIZE = 1024 * 1024
+# Characters b64decode would silently discard, such as line breaks
+_NON_BASE64_CHARS = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+def _create_unique(full_path: Path, mode: str) -> tuple[IO, Path]:
+    """Exclusively create full_path, adding a _N suffix on name collisions.
+
+    Each attempt is a single O_EXCL open, so there is no exists() probe per
+    candidate and no race between checking a name and writing to it.
+    """
+    base_name = full_path.stem
+    extension = full_path.suffix
+    candidate = full_path
+    counter = 1
+    while True:
+        try:
+            return open(candidate, mode), candidate
+        except FileExistsError:
+            candidate = full_path.with_name(f"{base_name}_{counter}{extension}")
+            counter += 1
+
+
+def _save_upload(upload_dir: Path, file_path: str, file_content: str) -> Path:
+    """Write an uploaded file under upload_dir, avoiding name collisions.
+
+    Args:
+        upload_dir: Directory uploads are stored in
+        file_path: Requested path relative to upload_dir
+        file_content: Text content, or a base64 data URL for binary files
+
+    Returns:
+        The path the file was actually written to
+    """
+    # Create the upload directory if it doesn't exist
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    # Create the full path within the upload directory
+    full_path = upload_dir / file_path
+
+    # Ensure any subdirectories exist
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Check if content is base64 encoded (for binary files)
+    is_data_url = file_content.startswith("data:")
+    f, full_path = _create_unique(full_path, "xb" if is_data_url else "x")
+    try:
+        with f:
+            if is_data_url:
+                # Handle data URLs (e.g., "data:application/pdf;base64,...")
+                # Decode and write chunk by chunk past the header so neither a
+                # copy of the encoded payload nor the whole decoded file is held
+                # in memory. Discarded characters would break 4-character
+                # alignment, so drop them first and carry any partial quantum
+                # into the next chunk.
+                start = file_content.index(",") + 1
+                pending = ""
+                for offset in range(start, len(file_content), _BASE64_CHUNK_SIZE):
+                    chunk = pending + _NON_BASE64_CHARS.sub(
+                        "", file_content[offset : offset + _BASE64_CHUNK_SIZE]
+                    )
+                    aligned = len(chunk) - len(chunk) % 4
+                    f.write(base64.b64decode(chunk[:aligned]))
+                    pending = chunk[aligned:]
+                if pending:
+                    # Unpadded leftovers raise the same error as a one-shot
+                    # decode
+                    f.write(base64.b64decode(pending))
+            else:
+                # Write text content
+                f.write(file_content)
+    except BaseException:
+        # Never leave an empty or truncated file behind under the upload name
+        full_path.unlink(missing_ok=True)
+        raise
+
+    return full_path
 
 
 @upload_router.post("/upload")
@@ -25,12 +109,12 @@ async def upload_file_endpoint(request: Request):
         file_info = data.get("file")
 
         if not session_id:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400, content={"error": "session_id is required"}
             )
 
         if not file_info:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400, content={"error": "No file provided for upload"}
             )
 
@@ -39,21 +123,19 @@ async def upload_file_endpoint(request: Request):
 
         # Find the workspace path for this session
         workspace_path = Path(workspace).resolve() / session_id
-        if not workspace_path.exists():
-            return JSONResponse(
+        if not await asyncio.to_thread(workspace_path.exists):
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": f"Workspace not found for session: {session_id}"},
             )
 
-        # Create the upload directory if it doesn't exist
         upload_dir = workspace_path / UPLOAD_FOLDER_NAME
-        upload_dir.mkdir(parents=True, exist_ok=True)
 
         file_path = file_info.get("path", "")
         file_content = file_info.get("content", "")
 
         if not file_path:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400, content={"error": "File path is required"}
             )
 
@@ -61,44 +143,12 @@ async def upload_file_endpoint(request: Request):
         if Path(file_path).is_absolute():
             file_path = Path(file_path).name
 
-        # Create the full path within the upload directory
-        original_path = upload_dir / file_path
-        full_path = original_path
-
-        # Handle filename collision by adding a suffix
-        if full_path.exists():
-            base_name = full_path.stem
-            extension = full_path.suffix
-            counter = 1
-
-            # Keep incrementing counter until we find a unique filename
-            while full_path.exists():
-                new_filename = f"{base_name}_{counter}{extension}"
-                full_path = upload_dir / new_filename
-                counter += 1
-
-            # Update the file_path to reflect the new name
-            file_path = f"{full_path.relative_to(upload_dir)}"
-
-        # Ensure any subdirectories exist
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Check if content is base64 encoded (for binary files)
-        if file_content.startswith("data:"):
-            # Handle data URLs (e.g., "data:application/pdf;base64,...")
-            # Split the header from the base64 content
-            header, encoded = file_content.split(",", 1)
-
-            # Decode the content
-            decoded = base64.b64decode(encoded)
-
-            # Write binary content
-            with open(full_path, "wb") as f:
-                f.write(decoded)
-        else:
-            # Write text content
-            with open(full_path, "w") as f:
-                f.write(file_content)
+        # Directory creation, collision checks and the write itself all block,
+        # so run them together off the event loop
+        full_path = await asyncio.to_thread(
+            _save_upload, upload_dir, file_path, file_content
+        )
+        file_path = f"{full_path.relative_to(upload_dir)}"
 
         # Log the upload
         logger.info(f"File uploaded to {full_path}")
@@ -113,6 +163,6 @@ async def upload_file_endpoint(request: Request):
 
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500, content={"error": f"Error uploading file: {str(e)}"}
         )
@@ -1,7 +1,8 @@
 import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-import os
 from fastapi.staticfiles import StaticFiles
 
 from .api import upload_router, sessions_router, settings_router
@@ -10,6 +11,15 @@ from ii_agent.server import shared
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build app-lifetime dependencies once at startup."""
+    app.state.settings_store = await shared.SettingsStoreImpl.get_instance(
+        shared.config, user_id=None
+    )
+    yield
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application.
 
@@ -19,7 +29,7 @@ def create_app() -> FastAPI:
     Returns:
         FastAPI: Configured FastAPI application instance
     """
-    app = FastAPI(title="Agent WebSocket API")
+    app = FastAPI(title="Agent WebSocket API", lifespan=lifespan)
 
     # Add CORS middleware
     app.add_middleware(
@@ -57,17 +67,10 @@ def setup_workspace(app: FastAPI, workspace_path: str):
         app: FastAPI application instance
         workspace_path: Path to the workspace directory
     """
-    try:
-        app.mount(
-            "/workspace",
-            StaticFiles(directory=workspace_path, html=True),
-            name="workspace",
-        )
-    except RuntimeError:
-        # Directory might not exist yet
-        os.makedirs(workspace_path, exist_ok=True)
-        app.mount(
-            "/workspace",
-            StaticFiles(directory=workspace_path, html=True),
-            name="workspace",
-        )
+    # Create the root once up front so static serving works on a fresh install
+    os.makedirs(workspace_path, exist_ok=True)
+    app.mount(
+        "/workspace",
+        StaticFiles(directory=workspace_path, html=True),
+        name="workspace",
+    )
@@ -2,18 +2,40 @@ from fastapi import Request
 
 from ii_agent.core.storage.models.settings import Settings
 from ii_agent.core.storage.settings.settings_store import SettingsStore
-from ii_agent.server import shared
-from ii_agent.server.shared import SettingsStoreImpl
+
+# (settings generation, serialized body) of the last scrubbed GET /api/settings
+# response
+_settings_cache: tuple[int, bytes] | None = None
+# Bumped whenever settings are stored, so holders of a loaded copy can refresh
+_settings_generation = 0
 
 
 async def get_settings_store(request: Request) -> SettingsStore:
-    settings_store: SettingsStore | None = getattr(request.state, 'settings_store', None)
-    if settings_store:
-        return settings_store
-    settings_store = await SettingsStoreImpl.get_instance(shared.config, user_id=None)
-    request.state.settings_store = settings_store
-    return settings_store
+    # Kept async so FastAPI resolves it inline rather than in the threadpool
+    return request.app.state.settings_store
+
 
 async def get_settings(request: Request) -> Settings:
     settings_store = await get_settings_store(request)
-    return await settings_store.load()
\ No newline at end of file
+    return await settings_store.load()
+
+
+def get_cached_settings_payload(generation: int) -> bytes | None:
+    if _settings_cache is not None and _settings_cache[0] == generation:
+        return _settings_cache[1]
+    return None
+
+
+def cache_settings_payload(generation: int, payload: bytes) -> None:
+    global _settings_cache
+    _settings_cache = (generation, payload)
+
+
+def settings_generation() -> int:
+    return _settings_generation
+
+
+def invalidate_settings_cache() -> None:
+    global _settings_cache, _settings_generation
+    _settings_cache = None
+    _settings_generation += 1
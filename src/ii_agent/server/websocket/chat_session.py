@@ -1,17 +1,23 @@
 import asyncio
-import json
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+
+import orjson
 import uuid
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import ValidationError
 
 from ii_agent.core.config.client_config import ClientConfig
-from ii_agent.llm.base import ToolCall
 from ii_agent.agents.base import BaseAgent
 from ii_agent.agents.reviewer import ReviewerAgent
-from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.event import EventQueue, RealtimeEvent, EventType
 from ii_agent.core.storage.files import FileStore
 from ii_agent.core.storage.models.settings import Settings
 from ii_agent.core.storage.settings.file_settings_store import FileSettingsStore
@@ -20,8 +26,8 @@ from ii_agent.llm import get_client
 from ii_agent.utils.prompt_generator import enhance_user_prompt
 from ii_agent.utils.sandbox_manager import SandboxManager
 from ii_agent.utils.workspace_manager import WorkspaceManager
+from ii_agent.server.settings import settings_generation
 from ii_agent.server.models.messages import (
-    WebSocketMessage,
     QueryContent,
     InitAgentContent,
     EnhancePromptContent,
@@ -35,13 +41,105 @@ from ii_agent.agents.function_call import FunctionCallAgent
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
 from ii_agent.llm.token_counter import TokenCounter
 from ii_agent.tools import get_system_tools
+from ii_agent.tools.message_tool import MessageTool
 from ii_agent.prompts.system_prompt import (
     SystemPromptBuilder,
 )
-from ii_agent.prompts.reviewer_system_prompt import REVIEWER_SYSTEM_PROMPT
+from ii_agent.prompts.reviewer_system_prompt import build_reviewer_prompt
 
 logger = logging.getLogger(__name__)
 
+# One queue-fed listener per (log file, stdout) combination. Agent loggers only
+# enqueue records; the listener thread owns the actual file/stream handlers so
+# disk writes never happen on the event loop.
+_AGENT_LOG_HANDLERS: Dict[tuple, logging.handlers.QueueHandler] = {}
+
+# TokenCounter is stateless, so every context manager can share one instance.
+_TOKEN_COUNTER = TokenCounter()
+
+# Upper bound on queued events coalesced into a single WebSocket frame.
+MAX_EVENTS_PER_FRAME = 128
+# Outbound events a session may have queued before producers wait on the client.
+MAX_QUEUED_EVENTS = 1024
+# Agent events not yet saved and handed to the outbox before the agent pauses
+# between turns for its message processor to catch up.
+MAX_AGENT_QUEUED_EVENTS = 1024
+# Purely informational events that are dropped rather than waited on when the
+# outbox is full. Pre-serialized payloads opt in via _send_payload(droppable=True).
+_DROPPABLE_EVENT_TYPES = frozenset({EventType.PROCESSING})
+# How long a closing session waits for queued events to reach the client.
+EVENT_FLUSH_TIMEOUT = 5.0
+# Long blocking LLM jobs get their own bounded pools so they neither queue
+# behind nor starve the default executor used for file and settings I/O.
+_REVIEWER_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reviewer")
+_SUMMARY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+# Session-table writes share one small pool so a slow SQLite commit never holds
+# up the event loop and writers do not pile up on the default executor.
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="db")
+
+# How long a disconnected session's agent run may take to stop on its own
+# (and save its history) before it is cancelled.
+AGENT_SHUTDOWN_TIMEOUT = 30.0
+# How long a session reuses an enhanced prompt for an identical request.
+ENHANCE_CACHE_TTL = 60.0
+# How long cleanup waits for a session's tasks to finish before cancelling them.
+CLEANUP_TIMEOUT = 2.0
+# Strong references to in-flight shutdowns so they are not garbage collected.
+_SHUTDOWN_TASKS: set[asyncio.Task] = set()
+
+# Inbound message types whose handlers do not read the message content.
+_NO_CONTENT_MESSAGE_TYPES = frozenset({"ping", "cancel", "workspace_info"})
+
+_HELP_TEXT = """## Available Commands
+
+- `/compact` - Summarize and compress the current conversation history
+- `/help` - Show this help message
+
+### Command Usage
+- `/compact`: Analyzes the entire conversation history and creates a detailed summary, then clears the history and starts fresh with the summary as context. This helps when approaching token limits or when you want to preserve context while starting fresh.
+"""
+
+
+def _serialize_event(event_type: EventType, content: dict) -> bytes:
+    return orjson.dumps({"type": event_type.value, "content": content})
+
+
+# Events whose content never changes, serialized once.
+_PONG_PAYLOAD = _serialize_event(EventType.PONG, {})
+_STREAM_COMPLETE_PAYLOAD = _serialize_event(EventType.STREAM_COMPLETE, {})
+_HELP_PAYLOAD = _serialize_event(EventType.SYSTEM, {"message": _HELP_TEXT})
+_PROCESSING_PAYLOAD = _serialize_event(
+    EventType.PROCESSING, {"message": "Processing your request..."}
+)
+_COMPACTING_PAYLOAD = _serialize_event(
+    EventType.PROCESSING, {"message": "Compacting conversation history..."}
+)
+_QUERY_CANCELLED_PAYLOAD = _serialize_event(
+    EventType.SYSTEM, {"message": "Query cancelled"}
+)
+_EDIT_MODE_PAYLOAD = _serialize_event(
+    EventType.SYSTEM, {"message": "Query editing mode activated"}
+)
+
+
+def _get_agent_log_handler(
+    logs_path: str, log_to_stdout: bool
+) -> logging.handlers.QueueHandler:
+    """Return the process-wide queue handler feeding the agent log file."""
+    key = (logs_path, log_to_stdout)
+    handler = _AGENT_LOG_HANDLERS.get(key)
+    if handler is None:
+        log_queue = queue.Queue(-1)
+        handlers = [logging.FileHandler(logs_path, delay=True)]
+        if log_to_stdout:
+            handlers.append(logging.StreamHandler())
+        listener = logging.handlers.QueueListener(log_queue, *handlers)
+        listener.start()
+        atexit.register(listener.stop)
+        handler = logging.handlers.QueueHandler(log_queue)
+        _AGENT_LOG_HANDLERS[key] = handler
+    return handler
+
 
 class ChatSession:
     """Manages a single standalone chat session with its own agent, workspace, and message handling."""
@@ -55,6 +153,8 @@ class ChatSession:
     ):
         self.websocket = websocket
         self.session_uuid = session_uuid
+        # Formatted once; used for workspace paths, history files and loggers.
+        self.session_id = str(session_uuid)
         self.file_store = file_store
         # Session state
         self.agent: Optional[BaseAgent] = None
@@ -62,60 +162,180 @@ class ChatSession:
         self.active_task: Optional[asyncio.Task] = None
         self.message_processor: Optional[asyncio.Task] = None
         self.reviewer_message_processor: Optional[asyncio.Task] = None
+        # Builds the reviewer agent on first review; set when it is enabled
+        self._reviewer_factory: Optional[Callable[[], ReviewerAgent]] = None
         self.first_message = True
         self.enable_reviewer = False
         self.config = config
+        # Resolved once; the workspace root cannot change during a session
+        self.workspace_root = Path(config.workspace_root).resolve()
+        self.workspace_path = str(self.workspace_root / self.session_id)
+        # Serialized outbound events, drained by a single writer task
+        self.outbox: asyncio.Queue[bytes] = asyncio.Queue(MAX_QUEUED_EVENTS)
+        self.writer_task: Optional[asyncio.Task] = None
+        # (settings generation, loaded settings), see _get_settings
+        self.settings: Optional[tuple[int, Optional[Settings]]] = None
+        # (client, text, files) -> (expiry, enhanced prompt), see
+        # _handle_enhance_prompt
+        self._enhanced_prompts: Dict[tuple, tuple[float, str]] = {}
 
     async def send_event(self, event: RealtimeEvent):
-        """Send an event to the client via WebSocket."""
-        if self.websocket:
+        """Queue an event for delivery to the client via WebSocket.
+
+        The event is serialized immediately, so later mutation of its content
+        cannot change what the client receives. When the client falls behind
+        and the outbox is full, informational events are dropped and everything
+        else waits for room.
+        """
+        if not self.websocket:
+            return
+        if self.outbox.full() and event.type in _DROPPABLE_EVENT_TYPES:
+            logger.debug(f"Outbox full, dropping {event.type.value} event")
+            return
+        try:
+            payload = orjson.dumps(event.model_dump())
+        except Exception as e:
+            logger.error(f"Error sending event to client: {e}")
+            return
+        await self.outbox.put(payload)
+
+    async def _send_payload(self, payload: bytes, droppable: bool = False):
+        """Queue an already serialized event for delivery to the client.
+
+        Droppable payloads are skipped instead of waited on when the outbox
+        is full, like the event types in _DROPPABLE_EVENT_TYPES.
+        """
+        if not self.websocket or (droppable and self.outbox.full()):
+            return
+        await self.outbox.put(payload)
+
+    async def _send_error(self, message: str):
+        """Queue an ERROR event for the client, serialized without pydantic."""
+        await self._send_payload(
+            _serialize_event(EventType.ERROR, {"message": message})
+        )
+
+    @functools.cached_property
+    def _workspace_info_payload(self) -> bytes:
+        # The workspace path is fixed for the session, so serialize it once
+        return _serialize_event(EventType.WORKSPACE_INFO, {"path": self.workspace_path})
+
+    async def _get_settings(self) -> Optional[Settings]:
+        """Load the stored settings, reusing this session's copy until they change."""
+        generation = settings_generation()
+        if self.settings is None or self.settings[0] != generation:
+            user_id = None  # TODO: Support user id
+            settings_store = await FileSettingsStore.get_instance(self.config, user_id)
+            self.settings = (generation, await settings_store.load())
+        return self.settings[1]
+
+    async def _write_events(self):
+        """Drain the outbox, sending each burst of events as one frame.
+
+        Events in a frame are newline-delimited JSON objects, so a burst of
+        stream/tool events costs one WebSocket write instead of one per event.
+        """
+        # Bound once: the socket and queue are fixed for the session, and
+        # cleanup() only clears self.websocket, which is still checked below
+        outbox = self.outbox
+        get, get_nowait, task_done = outbox.get, outbox.get_nowait, outbox.task_done
+        send_text = self.websocket.send_text
+        while True:
+            batch = [await get()]
+            while len(batch) < MAX_EVENTS_PER_FRAME and not outbox.empty():
+                batch.append(get_nowait())
             try:
-                await self.websocket.send_json(event.model_dump())
+                if self.websocket:
+                    await send_text(b"\n".join(batch).decode())
             except Exception as e:
                 logger.error(f"Error sending event to client: {e}")
+            finally:
+                for _ in batch:
+                    task_done()
+
+    async def _stop_writer(self):
+        """Give queued events a chance to go out, then stop the writer task.
+
+        Afterwards the websocket is detached and whatever is left in the outbox
+        is discarded, so producers already waiting in outbox.put() complete
+        instead of waiting forever on a queue nothing drains.
+        """
+        if self.writer_task is None:
+            return
+        try:
+            await asyncio.wait_for(self.outbox.join(), timeout=EVENT_FLUSH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out flushing queued events to client")
+        self.websocket = None
+        self.writer_task.cancel()
+        self.writer_task = None
+        outbox = self.outbox
+        while not outbox.empty():
+            while not outbox.empty():
+                outbox.get_nowait()
+                outbox.task_done()
+            # Let the producers woken by the gets finish their puts
+            await asyncio.sleep(0)
 
     async def start_chat_loop(self):
         """Start the chat loop for this session."""
+        self.writer_task = asyncio.create_task(self._write_events())
         await self.handshake()
+        receive = self.websocket.receive
         try:
             while True:
-                message_text = await self.websocket.receive_text()
-                message_data = json.loads(message_text)
+                # Read the raw ASGI message so text and binary frames both go
+                # straight to orjson without an intermediate decode
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message["code"], message.get("reason"))
+                raw = message.get("text")
+                if raw is None:
+                    raw = message["bytes"]
+                try:
+                    message_data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    await self._send_error("Invalid JSON format")
+                    continue
                 await self.handle_message(message_data)
-        except json.JSONDecodeError:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": "Invalid JSON format"},
-                )
-            )
         except WebSocketDisconnect:
             logger.info("Client disconnected")
+            # Nothing more can reach the client, so skip flushing the outbox
+            self.websocket = None
+        finally:
+            await self._stop_writer()
+            # Whatever ended the loop, nothing drains the outbox anymore. Stop
+            # producers from queuing into it, and let the agent wind down and
+            # release resources in the background so this handler returns now
             if self.agent:
                 self.agent.cancel()  # NOTE: Now we cancel the agent on disconnect, the background implementation will come later
+            self.websocket = None
+            shutdown_task = asyncio.create_task(self._shutdown())
+            _SHUTDOWN_TASKS.add(shutdown_task)
+            shutdown_task.add_done_callback(_SHUTDOWN_TASKS.discard)
 
-            # Wait for active task to complete before cleanup
-            if self.active_task and not self.active_task.done():
-                try:
-                    await self.active_task
-                except asyncio.CancelledError:
-                    logger.info("Active task was cancelled")
-                except Exception as e:
-                    logger.error(f"Error waiting for active task completion: {e}")
+    async def _shutdown(self):
+        """Wait (bounded) for a cancelled agent run to finish, then clean up."""
+        if self.active_task and not self.active_task.done():
+            try:
+                await asyncio.wait_for(self.active_task, timeout=AGENT_SHUTDOWN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("Active task did not stop in time and was cancelled")
+            except asyncio.CancelledError:
+                logger.info("Active task was cancelled")
+            except Exception as e:
+                logger.error(f"Error waiting for active task completion: {e}")
 
-            self.cleanup()
+        await self.cleanup()
 
     async def handshake(self):
         """Handle handshake message."""
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.CONNECTION_ESTABLISHED,
-                content={
+        await self._send_payload(
+            _serialize_event(
+                EventType.CONNECTION_ESTABLISHED,
+                {
                     "message": "Connected to Agent WebSocket Server",
-                    "workspace_path": str(
-                        Path(self.config.workspace_root).resolve()
-                        / str(self.session_uuid)
-                    ),
+                    "workspace_path": self.workspace_path,
                 },
             )
         )
@@ -123,95 +343,82 @@ class ChatSession:
     async def handle_message(self, message_data: dict):
         """Handle incoming WebSocket messages for this session."""
         try:
-            # Validate message structure
-            ws_message = WebSocketMessage(**message_data)
-            msg_type = ws_message.type
-            content = ws_message.content
+            # Handlers for these types ignore content, so skip validation
+            msg_type = message_data.get("type")
+            if msg_type in _NO_CONTENT_MESSAGE_TYPES:
+                await ChatSession._HANDLERS[msg_type](self, None)
+                return
 
-            # Route to appropriate handler
-            handlers = {
-                "init_agent": self._handle_init_agent,
-                "query": self._handle_query,
-                "workspace_info": self._handle_workspace_info,
-                "ping": self._handle_ping,
-                "cancel": self._handle_cancel,
-                "edit_query": self._handle_edit_query,
-                "enhance_prompt": self._handle_enhance_prompt,
-                "review_result": self._handle_review_result,
-            }
+            # Only the envelope shape is checked here; each handler validates
+            # its own content model, so a full WebSocketMessage parse is redundant
+            content = message_data.get("content", {})
+            if not isinstance(msg_type, str) or not isinstance(content, dict):
+                await self._send_error(
+                    "Invalid message format: expected a string 'type' "
+                    "and an object 'content'"
+                )
+                return
 
-            handler = handlers.get(msg_type)
+            # Route to appropriate handler
+            handler = ChatSession._HANDLERS.get(msg_type)
             if handler:
-                await handler(content)
+                await handler(self, content)
             else:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": f"Unknown message type: {msg_type}"},
-                    )
-                )
+                await self._send_error(f"Unknown message type: {msg_type}")
 
-        except ValidationError as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Invalid message format: {str(e)}"},
-                )
-            )
         except Exception as e:
             logger.error(f"Error handling message: {str(e)}")
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error processing request: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Error processing request: {str(e)}")
 
     async def _handle_init_agent(self, content: dict):
         """Handle agent initialization."""
         try:
-            init_content = InitAgentContent(**content)
+            init_content = InitAgentContent.model_validate(content)
+
+            # The database session only needs ids known up front, so create or
+            # fetch it while the settings load
+            device_id = self.websocket.query_params.get("device_id")
+            settings, (db_session, created) = await asyncio.gather(
+                self._get_settings(),
+                asyncio.get_running_loop().run_in_executor(
+                    _DB_EXECUTOR,
+                    functools.partial(
+                        Sessions.get_or_create_session,
+                        device_id=device_id,
+                        session_uuid=self.session_id,
+                        workspace_path=self.workspace_path,
+                    ),
+                ),
+            )
+            if created:
+                logger.info(
+                    f"Created new session {self.session_id} with workspace at {self.workspace_path}"
+                )
+            else:
+                logger.info(
+                    f"Found existing session {self.session_id} with workspace at {db_session.workspace_dir}"
+                )
 
             # Create LLM client using factory
-            user_id = None  # TODO: Support user id
-            settings_store = await FileSettingsStore.get_instance(self.config, user_id)
-            settings = await settings_store.load()
             llm_config = settings.llm_configs.get(init_content.model_name)
             if not llm_config:
                 raise ValueError(
                     f"LLM config not found for model: {init_content.model_name}"
                 )
 
-            llm_config.thinking_tokens = init_content.thinking_tokens
+            # Copy so the cached settings keep their stored thinking budget
+            llm_config = llm_config.model_copy(
+                update={"thinking_tokens": init_content.thinking_tokens}
+            )
             client = get_client(llm_config)
 
             # Create workspace manager
-            workspace_path = Path(self.config.workspace_root).resolve()
             workspace_manager = WorkspaceManager(
-                parent_dir=workspace_path,
-                session_id=str(self.session_uuid),
+                parent_dir=self.workspace_root,
+                session_id=self.session_id,
                 settings=settings,
             )
 
-            device_id = self.websocket.query_params.get("device_id")
-            session_id = workspace_manager.session_id
-            # Check and create database session
-            existing_session = Sessions.get_session_by_id(session_id)
-            if existing_session:
-                logger.info(
-                    f"Found existing session {session_id} with workspace at {existing_session.workspace_dir}"
-                )
-            else:
-                # Create new session if it doesn't exist
-                Sessions.create_session(
-                    device_id=device_id,
-                    session_uuid=session_id,
-                    workspace_path=workspace_manager.root,
-                )
-                logger.info(
-                    f"Created new session {session_id} with workspace at {workspace_manager.root}"
-                )
-
             sandbox_manager = SandboxManager(
                 session_id=self.session_uuid, settings=settings
             )
@@ -245,8 +452,11 @@ class ChatSession:
             # Check if reviewer is enabled in tool_args
             self.enable_reviewer = init_content.tool_args.get("enable_reviewer", False)
             if self.enable_reviewer:
-                # Create reviewer agent using factory
-                self.reviewer_agent = self._create_reviewer_agent(
+                # The reviewer gets a full toolset of its own (browser included),
+                # so defer building it until a review is actually requested
+                self.reviewer_agent = None
+                self._reviewer_factory = functools.partial(
+                    self._create_reviewer_agent,
                     client,
                     workspace_manager,
                     sandbox_manager,
@@ -255,12 +465,6 @@ class ChatSession:
                     settings=settings,
                 )
 
-                # Start message processor for reviewer
-                self.reviewer_message_processor = (
-                    self.reviewer_agent.start_message_processing()
-                )
-                print("Initialized Reviewer")
-
             await self.send_event(
                 RealtimeEvent(
                     type=EventType.AGENT_INITIALIZED,
@@ -274,30 +478,25 @@ class ChatSession:
                 )
             )
         except ValidationError as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Invalid init_agent content: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Invalid init_agent content: {str(e)}")
         except Exception as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error initializing agent: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Error initializing agent: {str(e)}")
 
     async def _handle_query(self, content: dict):
         """Handle query processing."""
         try:
-            query_content = QueryContent(**content)
+            query_content = QueryContent.model_validate(content)
 
             # Set session name from first message
             if self.first_message and query_content.text.strip():
                 # Extract first few words as session name (max 100 characters)
                 session_name = query_content.text.strip()[:100]
-                Sessions.update_session_name(self.session_uuid, session_name)
+                await asyncio.get_running_loop().run_in_executor(
+                    _DB_EXECUTOR,
+                    Sessions.update_session_name,
+                    self.session_uuid,
+                    session_name,
+                )
                 self.first_message = False
 
             # Check for slash commands
@@ -307,21 +506,11 @@ class ChatSession:
 
             # Check if there's an active task for this session
             if self.has_active_task():
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": "A query is already being processed"},
-                    )
-                )
+                await self._send_error("A query is already being processed")
                 return
 
             # Send acknowledgment
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.PROCESSING,
-                    content={"message": "Processing your request..."},
-                )
-            )
+            await self._send_payload(_PROCESSING_PAYLOAD, droppable=True)
 
             # Run the agent with the query in a separate task
             self.active_task = asyncio.create_task(
@@ -331,64 +520,34 @@ class ChatSession:
             )
 
         except ValidationError as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Invalid query content: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Invalid query content: {str(e)}")
 
     async def _handle_workspace_info(self, content: dict = None):
         """Handle workspace info request."""
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.WORKSPACE_INFO,
-                content={
-                    "path": str(
-                        Path(self.config.workspace_root).resolve()
-                        / str(self.session_uuid)
-                    )
-                },
-            )
-        )
+        await self._send_payload(self._workspace_info_payload)
 
     async def _handle_ping(self, content: dict = None):
         """Handle ping message."""
-        await self.send_event(RealtimeEvent(type=EventType.PONG, content={}))
+        await self._send_payload(_PONG_PAYLOAD, droppable=True)
 
     async def _handle_cancel(self, content: dict = None):
         """Handle query cancellation."""
         if not self.agent:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": "No active agent for this session"},
-                )
-            )
+            await self._send_error("No active agent for this session")
             return
 
         self.agent.cancel()
 
         # Send acknowledgment that cancellation was received
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.SYSTEM,
-                content={"message": "Query cancelled"},
-            )
-        )
+        await self._send_payload(_QUERY_CANCELLED_PAYLOAD)
 
     async def _handle_edit_query(self, content: dict):
         """Handle query editing."""
         try:
-            edit_content = EditQueryContent(**content)
+            edit_content = EditQueryContent.model_validate(content)
 
             if not self.agent:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": "No active agent for this session"},
-                    )
-                )
+                await self._send_error("No active agent for this session")
                 return
 
             # Cancel the agent and clear history
@@ -398,8 +557,10 @@ class ChatSession:
             # Delete events from database up to last user message if we have a session ID
             if self.agent.session_id:
                 try:
-                    Events.delete_events_from_last_to_user_message(
-                        self.agent.session_id
+                    await asyncio.get_running_loop().run_in_executor(
+                        _DB_EXECUTOR,
+                        Events.delete_events_from_last_to_user_message,
+                        self.agent.session_id,
                     )
                     await self.send_event(
                         RealtimeEvent(
@@ -411,38 +572,18 @@ class ChatSession:
                     )
                 except Exception as e:
                     logger.error(f"Error deleting session events: {str(e)}")
-                    await self.send_event(
-                        RealtimeEvent(
-                            type=EventType.ERROR,
-                            content={"message": f"Error clearing history: {str(e)}"},
-                        )
-                    )
+                    await self._send_error(f"Error clearing history: {str(e)}")
 
             # Send acknowledgment that query editing was received
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.SYSTEM,
-                    content={"message": "Query editing mode activated"},
-                )
-            )
+            await self._send_payload(_EDIT_MODE_PAYLOAD)
 
             # Check if there's an active task for this session
             if self.has_active_task():
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": "A query is already being processed"},
-                    )
-                )
+                await self._send_error("A query is already being processed")
                 return
 
             # Send processing acknowledgment
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.PROCESSING,
-                    content={"message": "Processing your request..."},
-                )
-            )
+            await self._send_payload(_PROCESSING_PAYLOAD, droppable=True)
 
             # Run the agent with the query in a separate task
             self.active_task = asyncio.create_task(
@@ -452,72 +593,34 @@ class ChatSession:
             )
 
         except ValidationError as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Invalid edit_query content: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Invalid edit_query content: {str(e)}")
 
     async def _handle_slash_command(self, command: str):
         """Handle slash commands."""
         try:
-            command_parts = command.split()
-            command_name = command_parts[0].lower()
+            command_name = command.partition(" ")[0].lower()
 
-            if command_name == "/compact":
-                await self._handle_compact_command()
-            elif command_name == "/help":
-                await self._handle_help_command()
+            handler = ChatSession._SLASH_COMMANDS.get(command_name)
+            if handler:
+                await handler(self)
             else:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={
-                            "message": f"Unknown command: {command_name}. Use /help to see available commands."
-                        },
-                    )
+                await self._send_error(
+                    f"Unknown command: {command_name}. "
+                    "Use /help to see available commands."
                 )
                 # Signal completion for unknown command
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.STREAM_COMPLETE,
-                        content={},
-                    )
-                )
+                await self._send_payload(_STREAM_COMPLETE_PAYLOAD)
         except Exception as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error processing command: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Error processing command: {str(e)}")
             # Signal completion even on error
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.STREAM_COMPLETE,
-                    content={},
-                )
-            )
+            await self._send_payload(_STREAM_COMPLETE_PAYLOAD)
 
     async def _handle_compact_command(self):
         """Handle /compact command to summarize conversation history."""
         try:
             if not self.agent or not self.agent.history:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={
-                            "message": "No conversation history available to compact."
-                        },
-                    )
-                )
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.STREAM_COMPLETE,
-                        content={},
-                    )
-                )
+                await self._send_error("No conversation history available to compact.")
+                await self._send_payload(_STREAM_COMPLETE_PAYLOAD)
                 return
 
             # Get the full conversation history as message lists
@@ -525,32 +628,16 @@ class ChatSession:
 
             # If history is empty, return early
             if not message_lists:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={
-                            "message": "No conversation history available to compact."
-                        },
-                    )
-                )
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.STREAM_COMPLETE,
-                        content={},
-                    )
-                )
+                await self._send_error("No conversation history available to compact.")
+                await self._send_payload(_STREAM_COMPLETE_PAYLOAD)
                 return
 
             # Send processing message
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.PROCESSING,
-                    content={"message": "Compacting conversation history..."},
-                )
-            )
+            await self._send_payload(_COMPACTING_PAYLOAD, droppable=True)
 
             # Use the context manager's new method to generate the complete summary
-            summary_response = await asyncio.to_thread(
+            summary_response = await asyncio.get_running_loop().run_in_executor(
+                _SUMMARY_EXECUTOR,
                 self.agent.history._context_manager.generate_complete_conversation_summary,
                 message_lists,
             )
@@ -578,7 +665,6 @@ class ChatSession:
                     type=EventType.SYSTEM,
                     content={
                         "message": f"Conversation compacted successfully. History has been summarized and condensed. This is the summarize {compact_summary}",
-                        "summary": compact_summary,
                     },
                 )
             )
@@ -592,13 +678,8 @@ class ChatSession:
             )
 
         except Exception as e:
-            logger.error(f"Error compacting conversation: {str(e)}")
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error compacting conversation: {str(e)}"},
-                )
-            )
+            logger.exception(f"Error compacting conversation: {str(e)}")
+            await self._send_error(f"Error compacting conversation: {str(e)}")
             # Signal completion even on error
             await self.send_event(
                 RealtimeEvent(
@@ -609,38 +690,17 @@ class ChatSession:
 
     async def _handle_help_command(self):
         """Handle /help command to show available commands."""
-        help_text = """## Available Commands
-
-- `/compact` - Summarize and compress the current conversation history
-- `/help` - Show this help message
-
-### Command Usage
-- `/compact`: Analyzes the entire conversation history and creates a detailed summary, then clears the history and starts fresh with the summary as context. This helps when approaching token limits or when you want to preserve context while starting fresh.
-"""
-
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.SYSTEM,
-                content={"message": help_text},
-            )
-        )
+        await self._send_payload(_HELP_PAYLOAD)
 
         # Signal that processing is complete
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.STREAM_COMPLETE,
-                content={},
-            )
-        )
+        await self._send_payload(_STREAM_COMPLETE_PAYLOAD)
 
     async def _handle_enhance_prompt(self, content: dict):
         """Handle prompt enhancement request."""
         try:
-            enhance_content = EnhancePromptContent(**content)
+            enhance_content = EnhancePromptContent.model_validate(content)
             # Create LLM client using factory
-            user_id = None  # TODO: Support user id
-            settings_store = await FileSettingsStore.get_instance(self.config, user_id)
-            settings = await settings_store.load()
+            settings = await self._get_settings()
 
             llm_config = settings.llm_configs.get(enhance_content.model_name)
             if not llm_config:
@@ -649,12 +709,29 @@ class ChatSession:
                 )
             client = get_client(llm_config)
 
-            # Call the enhance_prompt function
-            success, message, enhanced_prompt = await enhance_user_prompt(
-                client=client,
-                user_input=enhance_content.text,
-                files=enhance_content.files,
-            )
+            # A repeated click shortly after the first reuses its result
+            now = time.monotonic()
+            self._enhanced_prompts = {
+                key: entry
+                for key, entry in self._enhanced_prompts.items()
+                if entry[0] > now
+            }
+            cache_key = (client, enhance_content.text, tuple(enhance_content.files))
+            cached = self._enhanced_prompts.get(cache_key)
+            if cached is not None:
+                success, message, enhanced_prompt = True, "", cached[1]
+            else:
+                # Call the enhance_prompt function
+                success, message, enhanced_prompt = await enhance_user_prompt(
+                    client=client,
+                    user_input=enhance_content.text,
+                    files=enhance_content.files,
+                )
+                if success and enhanced_prompt:
+                    self._enhanced_prompts[cache_key] = (
+                        now + ENHANCE_CACHE_TTL,
+                        enhanced_prompt,
+                    )
 
             if success and enhanced_prompt:
                 # Send the enhanced prompt back to the client
@@ -669,93 +746,79 @@ class ChatSession:
                 )
             else:
                 # Send error message
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": message},
-                    )
-                )
+                await self._send_error(message)
 
         except ValidationError as e:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Invalid enhance_prompt content: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Invalid enhance_prompt content: {str(e)}")
 
     async def _handle_review_result(self, content: dict):
         """Handle reviewer's feedback."""
         try:
             if not self.agent:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": "No active agent for this session"},
-                    )
-                )
+                await self._send_error("No active agent for this session")
                 return
 
-            review_content = ReviewResultContent(**content)
+            review_content = ReviewResultContent.model_validate(content)
             user_input = review_content.user_input
 
             if not user_input:
-                await self.send_event(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": "No user query found to review"},
-                    )
-                )
+                await self._send_error("No user query found to review")
                 return
 
             await self._run_reviewer_async(user_input)
 
         except Exception as e:
             logger.error(f"Error handling review request: {str(e)}")
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error handling review request: {str(e)}"},
-                )
-            )
+            await self._send_error(f"Error handling review request: {str(e)}")
+
+    # Message type -> handler, built once with the class instead of per message
+    _HANDLERS = {
+        "init_agent": _handle_init_agent,
+        "query": _handle_query,
+        "workspace_info": _handle_workspace_info,
+        "ping": _handle_ping,
+        "cancel": _handle_cancel,
+        "edit_query": _handle_edit_query,
+        "enhance_prompt": _handle_enhance_prompt,
+        "review_result": _handle_review_result,
+    }
+
+    _SLASH_COMMANDS = {
+        "/compact": _handle_compact_command,
+        "/help": _handle_help_command,
+    }
 
     async def _run_agent_async(
         self, user_input: str, resume: bool = False, files: list = []
     ):
         """Run the agent asynchronously and send results back to the websocket."""
         if not self.agent:
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": "Agent not initialized for this session"},
-                )
-            )
+            await self._send_error("Agent not initialized for this session")
             return
 
         try:
-            # Add user message to the event queue to save to database
+            # Add user message to the event queue to save to database. The
+            # fields are already typed, so skip validation.
             self.agent.message_queue.put_nowait(
-                RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": user_input})
+                RealtimeEvent.model_construct(
+                    type=EventType.USER_MESSAGE, content={"text": user_input}
+                )
             )
             # Run the agent with the query using the new async method
             await self.agent.run_agent_async(user_input, files, resume)
-            # Save history to file store when finished
+            # Save history to file store when finished. Pickling and the file
+            # write happen in a worker thread so other sessions keep running;
+            # active_task is still set, so no new run can touch the history.
             if self.agent.history:
-                self.agent.history.save_to_session(
-                    str(self.session_uuid), self.file_store
+                await asyncio.to_thread(
+                    self.agent.history.save_to_session,
+                    self.session_id,
+                    self.file_store,
                 )
 
         except Exception as e:
-            logger.error(f"Error running agent: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error running agent: {str(e)}"},
-                )
-            )
+            logger.exception(f"Error running agent: {str(e)}")
+            await self._send_error(f"Error running agent: {str(e)}")
         finally:
             # Clean up the task reference
             self.active_task = None
@@ -763,24 +826,17 @@ class ChatSession:
     async def _run_reviewer_async(self, user_input: str):
         """Run the reviewer agent to analyze the main agent's output."""
         try:
+            reviewer_agent = self._get_reviewer_agent()
+            if reviewer_agent is None:
+                await self._send_error("Reviewer is not enabled for this session")
+                return
+
             # Extract the final result from the agent's history
-            final_result = ""
-            found = False
-            for message in self.agent.history._message_lists[::-1]:
-                for sub_message in message:
-                    if (
-                        hasattr(sub_message, "tool_name")
-                        and sub_message.tool_name == "message_user"
-                        and isinstance(sub_message, ToolCall)
-                    ):
-                        found = True
-                        final_result = sub_message.tool_input["text"]
-                        break
-                if found:
-                    break
-            if not found:
+            last_message_call = self.agent.history.get_last_tool_call(MessageTool.name)
+            if last_message_call is None:
                 logger.warning("No final result found from agent to review")
                 return
+            final_result = last_message_call.tool_input["text"]
             # Send notification that reviewer is starting
             await self.send_event(
                 RealtimeEvent(
@@ -793,12 +849,13 @@ class ChatSession:
             )
 
             # Run reviewer agent
-            reviewer_feedback = await asyncio.to_thread(
-                self.reviewer_agent.run_agent,
-                task=user_input,
-                result=final_result,
-                workspace_dir=str(
-                    Path(self.config.workspace_root).resolve() / str(self.session_uuid)
+            reviewer_feedback = await asyncio.get_running_loop().run_in_executor(
+                _REVIEWER_EXECUTOR,
+                functools.partial(
+                    reviewer_agent.run_agent,
+                    task=user_input,
+                    result=final_result,
+                    workspace_dir=self.workspace_path,
                 ),
             )
             if reviewer_feedback and reviewer_feedback.strip():
@@ -824,41 +881,68 @@ Please review this feedback and implement the suggested improvements to better c
                 await self.agent.run_agent_async(feedback_prompt, [], True)
 
         except Exception as e:
-            logger.error(f"Error running reviewer: {str(e)}")
-            await self.send_event(
-                RealtimeEvent(
-                    type=EventType.ERROR,
-                    content={"message": f"Error running reviewer: {str(e)}"},
-                )
+            logger.exception(f"Error running reviewer: {str(e)}")
+            await self._send_error(f"Error running reviewer: {str(e)}")
+
+    def _get_reviewer_agent(self) -> Optional[ReviewerAgent]:
+        """Return the reviewer agent, creating it on first use."""
+        if self.reviewer_agent is None and self._reviewer_factory is not None:
+            self.reviewer_agent = self._reviewer_factory()
+            self.reviewer_message_processor = (
+                self.reviewer_agent.start_message_processing()
             )
+            logger.info("Initialized Reviewer")
+        return self.reviewer_agent
 
     def has_active_task(self) -> bool:
         """Check if there's an active task for this session."""
         return self.active_task is not None and not self.active_task.done()
 
-    def cleanup(self):
-        """Clean up resources associated with this session."""
-        # Set websocket to None in the agent but keep the message processor running
+    async def cleanup(self):
+        """Clean up resources associated with this session.
+
+        Waits up to CLEANUP_TIMEOUT for the session's tasks to finish and
+        cancels whatever is still running, so no task outlives the session.
+        """
+        # Stop sending to the websocket; the message processors still save the
+        # events already queued and then exit
         if self.agent:
-            self.agent.websocket = (
-                None  # This will prevent sending to websocket but keep processing
-            )
+            self.agent.websocket = None
+            self.agent.message_queue.close()
 
         # Clean up reviewer agent
         if self.reviewer_agent:
             self.reviewer_agent.websocket = None
+            self.reviewer_agent.message_queue.close()
 
         # Cancel any running tasks
         if self.active_task and not self.active_task.done():
             self.active_task.cancel()
-            self.active_task = None
 
-        # Clean up references
-        self.websocket = None
-        self.agent = None
-        self.reviewer_agent = None
-        self.message_processor = None
-        self.reviewer_message_processor = None
+        tasks = {
+            task
+            for task in (
+                self.active_task,
+                self.message_processor,
+                self.reviewer_message_processor,
+            )
+            if task is not None and not task.done()
+        }
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=CLEANUP_TIMEOUT)
+                for task in pending:
+                    logger.warning("Session task did not stop in time, cancelling")
+                    task.cancel()
+        finally:
+            # Clean up references
+            self.websocket = None
+            self.agent = None
+            self.reviewer_agent = None
+            self._reviewer_factory = None
+            self.active_task = None
+            self.message_processor = None
+            self.reviewer_message_processor = None
 
     def _create_agent(
         self,
@@ -883,21 +967,12 @@ Please review this feedback and implement the suggested improvements to better c
         """
 
         # Setup logging
-        logger_for_agent_logs = logging.getLogger(f"agent_logs_{id(websocket)}")
-        logger_for_agent_logs.setLevel(logging.DEBUG)
-        logger_for_agent_logs.propagate = False
-
-        # Ensure we don't duplicate handlers
-        if not logger_for_agent_logs.handlers:
-            logger_for_agent_logs.addHandler(logging.FileHandler(self.config.logs_path))
-            if not self.config.minimize_stdout_logs:
-                logger_for_agent_logs.addHandler(logging.StreamHandler())
+        logger_for_agent_logs = self._setup_logger()
 
         # Create context manager
-        token_counter = TokenCounter()
         context_manager = LLMSummarizingContextManager(
             client=client,
-            token_counter=token_counter,
+            token_counter=_TOKEN_COUNTER,
             logger=logger,
             token_budget=self.config.token_budget,
         )
@@ -930,7 +1005,7 @@ Please review this feedback and implement the suggested improvements to better c
         """Create the actual agent instance."""
         # Initialize agent queue and tools
         session_id = workspace_manager.session_id
-        queue = asyncio.Queue()
+        queue = EventQueue(MAX_AGENT_QUEUED_EVENTS)
 
         system_prompt_builder = SystemPromptBuilder(
             workspace_manager.workspace_mode,
@@ -949,7 +1024,7 @@ Please review this feedback and implement the suggested improvements to better c
         # try to get history from file store
         init_history = MessageHistory(context_manager)
         try:
-            init_history.restore_from_session(str(session_id), file_store)
+            init_history.restore_from_session(session_id, file_store)
 
         except FileNotFoundError:
             logger.info(f"No history found for session {session_id}")
@@ -965,33 +1040,36 @@ Please review this feedback and implement the suggested improvements to better c
             max_output_tokens_per_turn=self.config.max_output_tokens_per_turn,
             max_turns=self.config.max_turns,
             websocket=websocket,
+            # Agent events join the session outbox so the writer task stays
+            # the only coroutine writing to the socket
+            event_sink=self._send_payload,
         )
 
         # Store the session ID in the agent for event tracking
         agent.session_id = session_id
         return agent
 
-    def _setup_logger(self, websocket: WebSocket) -> logging.Logger:
-        """Setup logger for the agent."""
-        logger_for_agent_logs = logging.getLogger(f"agent_logs_{id(websocket)}")
+    def _setup_logger(self) -> logging.Logger:
+        """Setup logger for the agent, shared by every connection to this session."""
+        logger_for_agent_logs = logging.getLogger(f"agent_logs_{self.session_id}")
         logger_for_agent_logs.setLevel(logging.DEBUG)
         logger_for_agent_logs.propagate = False
 
         # Ensure we don't duplicate handlers
         if not logger_for_agent_logs.handlers:
-            logger_for_agent_logs.addHandler(logging.FileHandler(self.config.logs_path))
-            if not self.config.minimize_stdout_logs:
-                logger_for_agent_logs.addHandler(logging.StreamHandler())
+            logger_for_agent_logs.addHandler(
+                _get_agent_log_handler(
+                    self.config.logs_path, not self.config.minimize_stdout_logs
+                )
+            )
 
         return logger_for_agent_logs
 
     def _create_context_manager(self, client: LLMClient, logger: logging.Logger):
         """Create context manager based on configuration."""
-        token_counter = TokenCounter()
-
         return LLMSummarizingContextManager(
             client=client,
-            token_counter=token_counter,
+            token_counter=_TOKEN_COUNTER,
             logger=logger,
             token_budget=self.config.token_budget,
         )
@@ -1018,13 +1096,13 @@ Please review this feedback and implement the suggested improvements to better c
             Configured reviewer agent instance
         """
         # Setup logging
-        logger_for_agent_logs = self._setup_logger(websocket)
+        logger_for_agent_logs = self._setup_logger()
 
         # Create context manager
         context_manager = self._create_context_manager(client, logger_for_agent_logs)
 
         # Initialize agent queue and tools
-        queue = asyncio.Queue()
+        queue = EventQueue()
         system_prompt_builder = SystemPromptBuilder(
             workspace_manager.workspace_mode,
             tool_args.get("sequential_thinking", False),
@@ -1039,7 +1117,7 @@ Please review this feedback and implement the suggested improvements to better c
             tool_args=tool_args,
         )
         reviewer_agent = ReviewerAgent(
-            system_prompt=REVIEWER_SYSTEM_PROMPT,
+            system_prompt=build_reviewer_prompt(),
             client=client,
             tools=tools,
             message_queue=queue,
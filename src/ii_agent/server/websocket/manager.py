@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from pathlib import Path
 import uuid
@@ -24,6 +25,11 @@ class ConnectionManager:
         self.sessions: Dict[WebSocket, ChatSession] = {}
         self.file_store = file_store
         self.config = config
+        # Resolved once; the workspace root does not change while serving
+        self.workspace_root = Path(config.workspace_root).resolve()
+        # Session workspaces already created by this process; nothing removes
+        # them while serving, so reconnects can skip the mkdir
+        self._created_workspaces: set[str] = set()
 
     async def connect(self, websocket: WebSocket) -> ChatSession:
         """Accept a new WebSocket connection and create a chat session."""
@@ -41,22 +47,25 @@ class ConnectionManager:
         self.sessions[websocket] = session
 
         # Quick Fix for upload
-        workspace_path = Path(self.config.workspace_root).resolve() / str(session_uuid)
-        workspace_path.mkdir(parents=True, exist_ok=True)
+        session_key = str(session_uuid)
+        if session_key not in self._created_workspaces:
+            workspace_path = self.workspace_root / session_key
+            # Off the event loop so a slow filesystem cannot stall other accepts
+            await asyncio.to_thread(workspace_path.mkdir, parents=True, exist_ok=True)
+            self._created_workspaces.add(session_key)
 
         logger.info(
             f"New WebSocket connection and chat session established: {id(websocket)}"
         )
         return session
 
-    def disconnect(self, websocket: WebSocket):
+    async def disconnect(self, websocket: WebSocket):
         """Handle WebSocket disconnection and cleanup."""
         logger.info(f"WebSocket disconnecting: {id(websocket)}")
 
-        if websocket in self.sessions:
-            session = self.sessions[websocket]
-            session.cleanup()
-            del self.sessions[websocket]
+        session = self.sessions.pop(websocket, None)
+        if session is not None:
+            await session.cleanup()
 
     def get_session(self, websocket: WebSocket) -> Optional[ChatSession]:
         """Get the chat session for a WebSocket connection."""
@@ -1,5 +1,4 @@
-import asyncio
-from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.event import EventQueue, EventType, RealtimeEvent
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.tools.image_search_tool import ImageSearchTool
 from ii_agent.tools.base import LLMTool
@@ -174,7 +173,7 @@ action = init
         self,
         client,
         workspace_manager: WorkspaceManager,
-        message_queue: asyncio.Queue,
+        message_queue: EventQueue,
         context_manager: ContextManager,
         ask_user_permission: bool = False,
     ):
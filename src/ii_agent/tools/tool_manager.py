@@ -1,8 +1,8 @@
-import asyncio
 import logging
 from copy import deepcopy
 from typing import List, Dict, Any
 
+from ii_agent.core.event import EventQueue
 from ii_agent.llm.base import LLMClient
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
 from ii_agent.llm.token_counter import TokenCounter
@@ -84,7 +84,7 @@ def get_system_tools(
     client: LLMClient,
     workspace_manager: WorkspaceManager,
     sandbox_manager: SandboxManager,
-    message_queue: asyncio.Queue,
+    message_queue: EventQueue,
     system_prompt_builder: SystemPromptBuilder,
     settings: Settings,
     tool_args: Dict[str, Any] = None,
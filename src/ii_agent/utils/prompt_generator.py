@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List, Tuple, Optional
 
@@ -48,8 +49,10 @@ Format your response as a single, well-structured prompt without explanations or
             TextPrompt(text=f"Enhance this request into a detailed prompt: {user_input}\n\nAdditional context - {file_context}")
         ]]
         
-        # Use the Anthropic client's generate method
-        response_blocks, _ = client.generate(
+        # Use the Anthropic client's generate method; it blocks, so keep it
+        # off the event loop
+        response_blocks, _ = await asyncio.to_thread(
+            client.generate,
             messages=messages,
             max_tokens=max_tokens,
             system_prompt=system_prompt,
@@ -65,7 +68,5 @@ Format your response as a single, well-structured prompt without explanations or
         return True, "Prompt enhanced successfully", enhanced_prompt
         
     except Exception as e:
-        logger.error(f"Error enhancing prompt: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Error enhancing prompt: {str(e)}")
         return False, f"Error enhancing prompt: {str(e)}", None
@@ -0,0 +1,152 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db import manager
+from ii_agent.db.models import Base, Event
+from ii_agent.server.models.messages import EventInfo, SessionInfo
+
+
+@pytest.fixture(autouse=True)
+def in_memory_db(monkeypatch):
+    """Point the table helpers at a throwaway in-memory database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        manager,
+        "SessionLocal",
+        sessionmaker(
+            autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+        ),
+    )
+    yield
+    engine.dispose()
+
+
+def _validated_fields(model_cls, raw: dict) -> dict:
+    return model_cls.model_validate(raw).model_dump()
+
+
+def _constructed_fields(model_cls, raw: dict) -> dict:
+    return model_cls.model_construct(**raw).model_dump()
+
+
+def test_session_rows_match_session_info_schema():
+    """The sessions API builds SessionInfo with model_construct, so rows must
+    already have the validated shape."""
+    session_uuid = uuid.uuid4()
+    manager.Sessions.create_session(
+        session_uuid, f"/tmp/{session_uuid}", device_id="device"
+    )
+
+    rows = manager.Sessions.get_sessions_by_device_id("device")
+
+    assert len(rows) == 1
+    assert _constructed_fields(SessionInfo, rows[0]) == _validated_fields(
+        SessionInfo, rows[0]
+    )
+
+
+def test_event_rows_match_event_info_schema():
+    """The events API builds EventInfo with model_construct, so rows must
+    already have the validated shape."""
+    session_uuid = uuid.uuid4()
+    manager.Sessions.create_session(session_uuid, f"/tmp/{session_uuid}")
+    manager.Events.save_event(
+        session_uuid,
+        RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": "hello"}),
+    )
+
+    rows = manager.Events.get_session_events_with_details(str(session_uuid))
+
+    assert len(rows) == 1
+    assert _constructed_fields(EventInfo, rows[0]) == _validated_fields(
+        EventInfo, rows[0]
+    )
+
+
+def test_get_or_create_session_inserts_once():
+    session_uuid = uuid.uuid4()
+    workspace = f"/tmp/{session_uuid}"
+
+    first, created = manager.Sessions.get_or_create_session(
+        session_uuid, workspace, device_id="device"
+    )
+    second, created_again = manager.Sessions.get_or_create_session(
+        session_uuid, workspace, device_id="other"
+    )
+
+    assert created is True
+    assert created_again is False
+    assert first.id == second.id == str(session_uuid)
+    assert second.device_id == "device"
+    assert second.created_at is not None
+
+
+def test_save_events_inserts_batch_in_order():
+    session_uuid = uuid.uuid4()
+    manager.Sessions.create_session(session_uuid, f"/tmp/{session_uuid}")
+    events = [
+        RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": str(i)})
+        for i in range(3)
+    ]
+
+    manager.Events.save_events(session_uuid, events)
+
+    rows = manager.Events.get_session_events(session_uuid)
+    assert [row.event_payload["content"]["text"] for row in rows] == ["0", "1", "2"]
+    assert all(row.event_type == EventType.USER_MESSAGE.value for row in rows)
+
+
+def _tie_timestamps(session_uuid):
+    """Give every event of the session the same timestamp, as a fast batch may."""
+    with manager.get_db() as db:
+        db.query(Event).filter(Event.session_id == str(session_uuid)).update(
+            {Event.timestamp: datetime(2025, 1, 1)}
+        )
+
+
+def test_batched_events_keep_insertion_order_on_timestamp_ties():
+    session_uuid = uuid.uuid4()
+    manager.Sessions.create_session(session_uuid, f"/tmp/{session_uuid}")
+    texts = [f"event {i}" for i in range(20)]
+    manager.Events.save_events(
+        session_uuid,
+        [
+            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": text})
+            for text in texts
+        ],
+    )
+    _tie_timestamps(session_uuid)
+
+    rows = manager.Events.get_session_events_with_details(str(session_uuid))
+
+    assert [row["event_payload"]["content"]["text"] for row in rows] == texts
+
+
+def test_delete_from_last_user_message_keeps_earlier_tied_events():
+    session_uuid = uuid.uuid4()
+    manager.Sessions.create_session(session_uuid, f"/tmp/{session_uuid}")
+    manager.Events.save_events(
+        session_uuid,
+        [
+            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": "kept"}),
+            RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": "edited"}),
+            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": "dropped"}),
+        ],
+    )
+    _tie_timestamps(session_uuid)
+
+    manager.Events.delete_events_from_last_to_user_message(session_uuid)
+
+    rows = manager.Events.get_session_events(session_uuid)
+    assert [row.event_payload["content"]["text"] for row in rows] == ["kept"]
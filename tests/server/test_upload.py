@@ -0,0 +1,45 @@
+import base64
+import binascii
+
+import pytest
+
+from ii_agent.server.api import upload
+from ii_agent.server.api.upload import _save_upload
+
+
+def test_invalid_data_url_leaves_no_file(tmp_path):
+    with pytest.raises(Exception):
+        _save_upload(tmp_path, "image.png", "data:image/png;base64,QQ")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_retry_after_failed_upload_keeps_the_requested_name(tmp_path):
+    with pytest.raises(Exception):
+        _save_upload(tmp_path, "image.png", "data:image/png;base64,QQ")
+
+    saved = _save_upload(tmp_path, "image.png", "data:image/png;base64,QUJD")
+
+    assert saved == tmp_path / "image.png"
+    assert saved.read_bytes() == b"ABC"
+
+
+def test_corrupt_final_chunk_leaves_no_truncated_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload, "_BASE64_CHUNK_SIZE", 8)
+    payload = base64.b64encode(bytes(range(48))).decode()
+
+    with pytest.raises(binascii.Error):
+        _save_upload(tmp_path, "blob.bin", f"data:;base64,{payload[:-4]}QQ=A")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_decode_matches_one_shot_decode(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload, "_BASE64_CHUNK_SIZE", 8)
+    data = bytes(range(256)) * 4
+    # encodebytes wraps lines, so whitespace falls inside chunks
+    payload = base64.encodebytes(data).decode()
+
+    saved = _save_upload(tmp_path, "blob.bin", f"data:;base64,{payload}")
+
+    assert saved.read_bytes() == data
@@ -5,6 +5,7 @@ from ii_agent.llm.base import (
     ToolCall,
     ToolFormattedResult,
 )
+from ii_agent.core.storage.memory import InMemoryFileStore
 from ii_agent.llm.message_history import MessageHistory
 
 
@@ -103,3 +104,101 @@ class TestToolCallIntegrity:
             [TextResult(text="Done")],
         ]
         assert result == expected
+
+
+class TestLastToolCall:
+    def test_tracks_most_recent_call_per_tool(self, message_history):
+        first = ToolCall(
+            tool_call_id="1", tool_name="message_user", tool_input={"text": "a"}
+        )
+        second = ToolCall(
+            tool_call_id="2", tool_name="message_user", tool_input={"text": "b"}
+        )
+        message_history.add_user_prompt("hi")
+        message_history.add_assistant_turn([first])
+        message_history.add_tool_call_result(first, "ok")
+        message_history.add_assistant_turn([TextResult(text="..."), second])
+
+        assert message_history.get_last_tool_call("message_user") is second
+        assert message_history.get_last_tool_call("other") is None
+
+    def test_index_follows_history_rewrites(self, message_history):
+        call = ToolCall(
+            tool_call_id="1", tool_name="message_user", tool_input={"text": "a"}
+        )
+        message_history.add_user_prompt("hi")
+        message_history.add_assistant_turn([call])
+
+        message_history.clear_from_last_to_user_message()
+        assert message_history.get_last_tool_call("message_user") is None
+
+        result = ToolFormattedResult(
+            tool_call_id="1", tool_name="message_user", tool_output="ok"
+        )
+        message_history.set_message_list([[TextPrompt(text="hi")], [call], [result]])
+        assert message_history.get_last_tool_call("message_user") is call
+
+        message_history.clear()
+        assert message_history.get_last_tool_call("message_user") is None
+
+
+class TestSessionPersistence:
+    def _restored(self, file_store):
+        history = MessageHistory(context_manager=None)
+        history.restore_from_session("session", file_store)
+        return history
+
+    def test_appended_turns_are_saved_as_segments(self, message_history):
+        file_store = InMemoryFileStore()
+        message_history.add_user_prompt("Hello")
+        message_history.save_to_session("session", file_store)
+        message_history.add_assistant_turn([TextResult(text="Hi there")])
+        message_history.save_to_session("session", file_store)
+
+        assert message_history._persisted_segments == 1
+        assert (
+            self._restored(file_store).get_messages_for_llm()
+            == message_history.get_messages_for_llm()
+        )
+
+    def test_rewritten_history_replaces_snapshot(self, message_history):
+        file_store = InMemoryFileStore()
+        message_history.add_user_prompt("Hello")
+        message_history.save_to_session("session", file_store)
+        message_history.add_assistant_turn([TextResult(text="Hi there")])
+        message_history.save_to_session("session", file_store)
+        message_history.clear_from_last_to_user_message()
+        message_history.add_user_prompt("Start over")
+        message_history.save_to_session("session", file_store)
+
+        assert message_history._persisted_segments == 0
+        assert self._restored(file_store).get_messages_for_llm() == [
+            [TextPrompt(text="Start over")]
+        ]
+
+    def test_two_histories_saving_one_session_never_mix(self):
+        file_store = InMemoryFileStore()
+        seed = MessageHistory(context_manager=None)
+        seed.add_user_prompt("Hello")
+        seed.save_to_session("session", file_store)
+
+        # e.g. a reconnect while the previous session is still shutting down
+        old = self._restored(file_store)
+        new = self._restored(file_store)
+        old.add_assistant_turn([TextResult(text="Old reply")])
+        new.add_assistant_turn([TextResult(text="New reply")])
+        new.save_to_session("session", file_store)
+        old.save_to_session("session", file_store)
+
+        assert (
+            self._restored(file_store).get_messages_for_llm()
+            == old.get_messages_for_llm()
+        )
+
+        new.add_user_prompt("Again")
+        new.save_to_session("session", file_store)
+
+        assert (
+            self._restored(file_store).get_messages_for_llm()
+            == new.get_messages_for_llm()
+        )
@@ -1,5 +1,7 @@
 import argparse
 import logging
+import sys
+
 import uvicorn
 
 from ii_agent.server.app import create_app
@@ -25,6 +27,14 @@ def main():
         default=8000,
         help="Port to run the server on",
     )
+    parser.add_argument(
+        "--ws-per-message-deflate",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Negotiate permessage-deflate on WebSocket connections. Off by "
+        "default: events are small and batched, so compressing every frame "
+        "costs more CPU than it saves on local or LAN links",
+    )
     args = parser.parse_args()
 
     # Create the FastAPI app
@@ -32,7 +42,16 @@ def main():
 
     # Start the FastAPI server
     logger.info(f"Starting WebSocket server on {args.host}:{args.port}")
-    uvicorn.run(app, host=args.host, port=args.port)
+    # uvloop and httptools ship with uvicorn[standard]; ask for them explicitly
+    # so a missing extra fails loudly instead of silently falling back.
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws_per_message_deflate=args.ws_per_message_deflate,
+    )
 
 
 if __name__ == "__main__":